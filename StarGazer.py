@@ -9,121 +9,45 @@ from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 from streamlit_echarts import st_echarts
-import requests
 import json
 from pyvis import network as net
 from stvis import pv_static
-import io
 import collections
-from sklearn import preprocessing
-import base64
-from io import BytesIO
 import os
 from PIL import Image
 import webbrowser
+from stargazer import charts, export, network, scoring, snapshot, sources, store, tables
+from stargazer.sources import proteins_interaction, go_enrichment
 
 # download function
-def get_table_download_link(df):
-    """Generates a link allowing the data in a given panda dataframe to be downloaded
-    in:  dataframe
-    out: href string
+def download_table(df, key):
+    """Offers a dataframe for download; it is only serialised once the user asks for it
+    in:  dataframe, widget key unique on the page (also the file name)
     """
-    csv = df.to_csv(index=True)
-    b64 = base64.b64encode(csv.encode()).decode()  # some strings <-> bytes conversions necessary here
-    href = f'<a href="data:file/csv;base64,{b64}">Download data</a>'
-    return href
-
-# function to generate a data frame of gene symbol and openTargets association score
-def opentargets_gene_score(disease_name):
-
-    # Set base URL of GraphQL API endpoint
-    base_url = "https://api.platform.opentargets.org/api/v4/graphql"
-    
-    # query disease id via GraphQL API
-    query_string1 = """
-        query searchDiseaseID($diseaseName: String!, $entityNames: [String!]) {
-          search(queryString: $diseaseName, entityNames: $entityNames ) {
-            total
-          hits{
-            id
-            name
-          }
-          }
-        }
+    select_format = st.selectbox("Download format", list(export.FORMATS), key = key + "_format")
+    if st.button("Prepare download", key = key):
+        data, extension, mime = export.to_bytes(df, select_format)
+        st.download_button("Download data", data, file_name = "stargazer_" + key + extension, mime = mime, key = key + "_file")
+
+# paged table
+def show_table(df, key, in_expander = False, **kwargs):
+    """Shows one page of a dataframe; filtering, sorting and paging run on the server so only the visible rows are sent
+    in:  dataframe, widget key unique on the page, whether the table is already inside an expander
+         (Streamlit does not nest expanders, the controls then form a row of columns), st.dataframe arguments (height, width)
     """
-    
-    query_string2 = """
-        query associatedTargets($diseaseID: String!) {
-          disease(efoId: $diseaseID) {
-            id
-            name
-            associatedTargets(page: { index: 0, size: 300 })  {
-              count
-              rows {
-                target {
-                  approvedSymbol
-                }
-                score
-              }
-            }
-          }
-        }
-    """
-    # Set variables object of arguments to be passed to endpoint
-    variables = {"diseaseName": disease_name, "entityNames": ["disease"]}
-    
-    # Perform POST request and check status code of response
-    r = requests.post(base_url, json={"query": query_string1, "variables": variables})
-    
-    try:
-        df = pd.json_normalize(r.json()["data"]["search"]["hits"])
-        disease_id = df.loc[df["name"].str.lower() == disease_name.lower(), "id"].values[0]
-        variables = {"diseaseID": disease_id}
-
-        r = requests.post(base_url, json={"query": query_string2, "variables": variables})
-        gene_scoreDF = pd.json_normalize(r.json()["data"]["disease"]["associatedTargets"]["rows"])
-        gene_scoreDF = gene_scoreDF.rename({
-            "score": "opentargets_associations",
-            "target.approvedSymbol": "gene_symbol"
-        }, axis = 1)
-    except:
-        gene_scoreDF = []
-            
-    return gene_scoreDF
-
-def proteins_interaction(input_protein):
-    string_api_url = "https://string-db.org/api"
-    output_format = "tsv"
-    method = "network"
-    request_url = "/".join([string_api_url, output_format, method])
-    params = {
-    "identifiers" : "%0d".join(input_protein), # your protein in a list
-    "species" : 9606, # species NCBI identifier 
-    "caller_identity" : "stargazer" # your app name
-    }
-    response = requests.post(request_url, data=params)
-    r = response.content
-    rawData = pd.read_csv(io.StringIO(r.decode('utf-8')), sep = "\t")
-    rawData_drop = rawData.drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
-    return rawData_drop
-
-def go_enrichment(input_gene):
-    string_api_url = "https://string-db.org/api"
-    output_format = "tsv"
-    method = "enrichment"
-    request_url = "/".join([string_api_url, output_format, method])
-    params = {
-        "identifiers" : "%0d".join(input_gene), # your protein
-        "species" : 9606, # species NCBI identifier 
-        "caller_identity" : "stargazer" # your app name
-    }
-    response = requests.post(request_url, data=params)
-    r = response.content
-    rawData = pd.read_csv(io.StringIO(r.decode('utf-8')), sep = "\t")
-    return rawData
+    if in_expander:
+        controls = st.columns(4)
+    else:
+        controls = [st.expander("Filter, sort and browse " + str(len(df)) + " rows")] * 4
+    select_text = controls[0].text_input("Filter", help = "Keeps the rows whose text columns contain this text", key = key + "_filter")
+    select_sort = controls[1].selectbox("Sort by", ["--"] + tables.sort_columns(df), key = key + "_sort")
+    select_descending = controls[2].checkbox("Descending", key = key + "_descending")
+    select_page = controls[3].number_input("Page", min_value = 1, value = 1, step = 1, key = key + "_page")
+    df_page, total, page = tables.window(df, select_text, None if select_sort == "--" else select_sort, not select_descending, select_page - 1)
+    st.dataframe(df_page, **kwargs)
+    if total > len(df_page):
+        st.caption("Rows " + str(page * tables.PAGE_SIZE + 1) + "-" + str(page * tables.PAGE_SIZE + len(df_page)) + " of " + str(total))
 
-
-    
 ## main page set up
 st.set_page_config(layout="wide", page_title="StarGazer")
 
@@ -139,83 +63,22 @@ st.title("StarGazer: Multi-omics evidence-based drug target prioritization")
 
 select = st.sidebar.selectbox('Search by', ["--", 'Gene', 'Variant', 'PheWAS', 'GWAS', 'GWAS_PheWAS Union', 'GWAS_PheWAS Intersection', "Protein-protein Interaction", 'Disease Target Prioritization'], key='1')
 
-if 'count' not in st.session_state:
-    st.session_state.count = 0
-    
-    # initialising app
-    path = os.getcwd()
-
-    # import dataset
-    df = pd.read_csv(path + "/assets/phewas-catalog.csv")
-
-    # fill na with "Unknown"
-    df['gene_name'] = df['gene_name'].fillna("UNKNOWN")
-    df_selected = df[["gene_name", "snp", "phewas phenotype", "p-value", "odds-ratio", "gwas-associations"]]
-
-    # Adding COVID-19 module
-    full_url = "https://www.ebi.ac.uk/gwas/rest/api/efoTraits/MONDO_0100096/associations?projection=associationByEfoTrait"
-    r = requests.get(full_url, json={})
-    if r.status_code == 200:
-        COVID_df = pd.json_normalize(r.json()["_embedded"]["associations"], ["snps", ["genomicContexts"]], ["orPerCopyNum", "pvalue"], errors = "ignore")[["gene.geneName", "pvalue", "_links.snp.href", "orPerCopyNum"]].drop_duplicates(keep = "first")
-        COVID_df["_links.snp.href"] = COVID_df["_links.snp.href"].str.strip("{?projection}").str.split("Polymorphisms/").str[1]
-        COVID_df = COVID_df.loc[COVID_df["orPerCopyNum"].notna(), :].reset_index(drop = True)
-        COVID_df["orPerCopyNum"] = COVID_df["orPerCopyNum"].astype(float)
-        COVID_df = COVID_df.rename({
-            "gene.geneName": "gene_name",
-            "pvalue": "p-value",
-            "_links.snp.href": "snp",
-            "orPerCopyNum": "odds-ratio"
-        }, axis = 1)
-        COVID_df[["phewas phenotype", "gwas-associations"]] = "COVID-19"
-    df_selected = df_selected.append(COVID_df).reset_index(drop = True)
-    df_selected.to_csv(path + "/assets/df_selected.csv")
-
-    # extract data from Pharos
-    query_string = """
-    query AllTargets {
-        targets(
-            filter: { 
-              facets: [{
-                  facet: "Target Development Level",
-                    values: ["Tclin", "Tchem", "Tbio", "Tdark"]
-                }]
-            }
-        ) {
-            targets (top : 100000) {
-                sym
-                tdl
-            }
-        }
-    }
-    """
-
-    r = requests.post("https://pharos-api.ncats.io/graphql", json={"query": query_string})
-    if r.status_code == 200:
-        df_druggable = pd.DataFrame(r.json()["data"]["targets"]["targets"]).drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
-        df_druggable.to_csv(path + "/assets/df_druggable.csv")
-
-
-
-
-
+# the data snapshot is built out of the request path by `python -m stargazer ingest`
+if snapshot.current_version() is None:
+    st.error("No data snapshot found. Please build one with `python -m stargazer ingest` and reload the page.")
+    st.stop()
 
 if select == "Gene":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the associated phenotypes of your genes of interest.")
     # sidebar -- gene & variant select boxs
-    gene = sorted(df_selected["gene_name"].unique().tolist())
+    variant_index = store.variant_index()
+    gene = variant_index.genes
     select_gene = st.sidebar.selectbox('Gene', gene, key='2')
-    variant = sorted(df_selected[df_selected["gene_name"] == select_gene]["snp"].unique().tolist())
+    variant = variant_index.gene_variants(select_gene)
     select_variant = st.sidebar.selectbox('Variant', variant, key='3')
 
-    # subset the data frame
-    df_variant = df_selected[df_selected["snp"] == select_variant]
-
     # sidebar --  p-value slider
-    df_variant.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
     select_p = st.sidebar.text_input(label = "P-value", help = "Defaults to p = 0.05. Accepts scientific notation, e.g., 5E-4, 3e-9", value = "0.05")
     try:
         if (float(select_p) <= 1) & (float(select_p) > 0):
@@ -225,8 +88,11 @@ if select == "Gene":
     except:
         select_p = 0.05
 
+    # subset the data frame, the rows of a variant are sorted by p-value
+    df_variant_p = store.association_rows(store.variant_rows(select_variant, p = select_p))
+    df_variant_p.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
+
     # display the top 5 destructive / protective phenoytpes
-    df_variant_p = df_variant[df_variant["p-value"] <= select_p]
     df_variant_p_des = df_variant_p[df_variant_p["odds-ratio"] >= 1]
     df_variant_p_des = df_variant_p_des[["phewas phenotype", "gene_name", "snp", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
     df_variant_p_pro = df_variant_p[df_variant_p["odds-ratio"] < 1]
@@ -239,33 +105,27 @@ if select == "Gene":
         with col1:
             st.subheader("Odds ratios of associated phenotypes")
             df_variant_p.sort_values(by=['odds-ratio'], inplace=True, ascending=True)
-            fig = px.bar(df_variant_p, y = "phewas phenotype", x = "odds-ratio", color = "odds-ratio", color_continuous_scale = px.colors.sequential.RdBu_r, color_continuous_midpoint = 1, height= 1000)
+            fig = charts.odds_ratio_bars(df_variant_p)
             #fig.add_vline(x = 1)
             st.plotly_chart(fig, use_container_width= True)
         with col2:
             st.subheader("Data")
-            st.markdown(get_table_download_link(df_variant_p), unsafe_allow_html=True)
+            download_table(df_variant_p, key = "gene_variant")
             st.write('Risk allele-associated phenotypes (odds ratio > 1)')
-            st.dataframe(df_variant_p_des, height = 400)
+            show_table(df_variant_p_des, key = "gene_variant_risk", height = 400)
             st.write('Protective allele-associated phenotypes (odds ratio < 1)')
-            st.dataframe(df_variant_p_pro, height = 400)
+            show_table(df_variant_p_pro, key = "gene_variant_protective", height = 400)
 
 elif select == "Variant":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the associated phenotypes of your gene variants of interest.")
 
     # sidebar -- variant select box
-    variant = sorted(df_selected["snp"].unique().tolist())
+    variant_index = store.variant_index()
+    variant = variant_index.snps
     select_variant = st.sidebar.selectbox('Variant', variant, key='4')
 
-    # subset the data frame
-    df_variant = df_selected[df_selected["snp"] == select_variant]
-
     # sidebar --  p-value slider
-    df_variant.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
     select_p = st.sidebar.text_input(label = "P-value", help = "Defaults to p = 0.05. Accepts scientific notation, e.g., 5E-4, 3e-9", value = "0.05")
     try:
         if (float(select_p) <= 1) & (float(select_p) > 0):
@@ -275,8 +135,11 @@ elif select == "Variant":
     except:
         select_p = 0.05
 
+    # subset the data frame, the rows of a variant are sorted by p-value
+    df_variant_p = store.association_rows(store.variant_rows(select_variant, p = select_p))
+    df_variant_p.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
+
     # display the top 5 destructive / protective phenoytpes
-    df_variant_p = df_variant[df_variant["p-value"] <= select_p]
     df_variant_p_des = df_variant_p[df_variant_p["odds-ratio"] >= 1]
     df_variant_p_des = df_variant_p_des[["phewas phenotype", "gene_name", "snp", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
     df_variant_p_pro = df_variant_p[df_variant_p["odds-ratio"] < 1]
@@ -290,36 +153,26 @@ elif select == "Variant":
         with col1:
             st.subheader("Odds ratios of associated phenotypes")
             df_variant_p.sort_values(by=['odds-ratio'], inplace=True, ascending=True)
-            fig = px.bar(df_variant_p, y = "phewas phenotype", x = "odds-ratio", color = "odds-ratio", color_continuous_scale = px.colors.sequential.RdBu_r, color_continuous_midpoint = 1, height= 1000)
+            fig = charts.odds_ratio_bars(df_variant_p)
             st.plotly_chart(fig, use_container_width= True)
         with col2:
             st.subheader("Data")
-            st.markdown(get_table_download_link(df_variant_p), unsafe_allow_html=True)
+            download_table(df_variant_p, key = "variant")
             st.write('Risk allele-associated phenotypes (odds ratio > 1)')
-            st.dataframe(df_variant_p_des, height = 400)
+            show_table(df_variant_p_des, key = "variant_risk", height = 400)
             st.write('Protective allele-associated phenotypes (odds ratio < 1)')
-            st.dataframe(df_variant_p_pro, height = 400)
+            show_table(df_variant_p_pro, key = "variant_protective", height = 400)
 
 elif select == "GWAS":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the gene variants found in GWASs that are associated with your diseases of interest. It displays all associations, before separating associations into risk and protective. ")
 
     # extract diseases
-    disease = ["--"]
-    for i in list(set(df_selected["gwas-associations"].tolist())):
-        disease.extend(i.split(", "))
-    disease = sorted(list(set(disease)))
+    disease = ["--"] + store.vocabulary().gwas
 
     # sidebar -- disease select box
     select_disease = st.sidebar.selectbox('Disease', disease, key='5')
 
-    # subset the data frame for GWAS-associations
-    df_disease_gwas = df_selected[df_selected["gwas-associations"].str.contains(select_disease)]
-    df_disease_gwas = df_disease_gwas[["snp", "gene_name", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations"]]
-
     # sidebar --  p-value slider
     select_p = st.sidebar.text_input(label = "P-value", help = "Defaults to p = 0.05. Accepts scientific notation, e.g., 5E-4, 3e-9", value = "0.05")
     try:
@@ -329,18 +182,15 @@ elif select == "GWAS":
             select_p = 0.05
     except:
         select_p = 0.05
-    df_disease_gwas = df_disease_gwas[df_disease_gwas["p-value"] <= select_p]
-    
-    # find the druggable genes
-    # druggable evidence
-    df_disease_gwas = pd.merge(df_disease_gwas, df_druggable, left_on='gene_name', right_on = "sym", how='left')
-    df_disease_gwas['tdl'] = df_disease_gwas['tdl'].fillna("None")
-    df_disease_gwas = df_disease_gwas.rename(columns={'tdl': 'druggability level'})
+
+    # subset the data frame for GWAS-associations
+    df_disease_gwas = store.query(select_disease, p = select_p, study = "gwas")
+    df_disease_gwas = df_disease_gwas[["snp", "gene_name", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
 
     # subset the data by odds ratio
     df_disease_gwas = df_disease_gwas.reset_index().drop("index", axis= 1)
-    df_disease_gwas_sub_des = df_disease_gwas[df_disease_gwas["odds-ratio"] >= 1]
-    df_disease_gwas_sub_pro = df_disease_gwas[df_disease_gwas["odds-ratio"] < 1]
+    df_disease_gwas_sub_des = store.query(select_disease, p = select_p, study = "gwas", direction = "risk")[df_disease_gwas.columns].reset_index().drop("index", axis= 1)
+    df_disease_gwas_sub_pro = store.query(select_disease, p = select_p, study = "gwas", direction = "protective")[df_disease_gwas.columns].reset_index().drop("index", axis= 1)
 
     # count the druggability levels and generate data for pie chart (risk)
     df_tdl_des = df_disease_gwas_sub_des[["gene_name", "druggability level"]].drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
@@ -369,24 +219,15 @@ elif select == "GWAS":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_gwas, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_gwas)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("GWAS data:")
             df_disease_gwas = df_disease_gwas[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_gwas = df_disease_gwas.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_gwas.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_gwas)
+            download_table(df_disease_gwas, key = "gwas")
+            show_table(df_disease_gwas, key = "gwas", in_expander = True)
 
     st.subheader("Risk alleles (odds ratio > 1)")
     with st.container():
@@ -406,24 +247,15 @@ elif select == "GWAS":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_gwas_sub_des, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_gwas_sub_des)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("GWAS data (Odds-ratio > 1):")
             df_disease_gwas_sub_des = df_disease_gwas_sub_des[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_gwas_sub_des.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_gwas_sub_des = df_disease_gwas_sub_des.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_gwas_sub_des.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_gwas_sub_des)
+            download_table(df_disease_gwas_sub_des, key = "gwas_risk")
+            show_table(df_disease_gwas_sub_des, key = "gwas_risk", in_expander = True)
     
     st.subheader("Protective alleles (odds ratio < 1)")
     with st.container():
@@ -443,46 +275,26 @@ elif select == "GWAS":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_gwas_sub_pro, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_gwas_sub_pro)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("GWAS data (Odds-ratio < 1):")
             df_disease_gwas_sub_pro = df_disease_gwas_sub_pro[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_gwas_sub_pro.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_gwas_sub_pro = df_disease_gwas_sub_pro.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_gwas_sub_pro.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_gwas_sub_pro)
+            download_table(df_disease_gwas_sub_pro, key = "gwas_protective")
+            show_table(df_disease_gwas_sub_pro, key = "gwas_protective", in_expander = True)
             
 elif select == "PheWAS":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the gene variants found in PheWASs that are associated with your diseases of interest. It displays all associations, before separating associations into risk and protective.")
 
     # extract diseases
-    disease = ["--"]
-    disease.extend(df_selected["phewas phenotype"].tolist())
-    disease = sorted(list(set(disease)))
+    disease = ["--"] + store.vocabulary().phewas
 
     # sidebar -- disease select box
     select_disease = st.sidebar.selectbox('Disease', disease, key='6')
 
-    # subset the data frame for PheWAS
-    df_disease_phewas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease)]
-
-    # subset the data frame for phewas phenotype
-    df_disease_phewas = df_disease_phewas[["snp", "gene_name", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations"]]
-
     # sidebar --  p-value slider
     select_p = st.sidebar.text_input(label = "P-value", help = "Defaults to p = 0.05. Accepts scientific notation, e.g., 5E-4, 3e-9", value = "0.05")
     try:
@@ -492,18 +304,17 @@ elif select == "PheWAS":
             select_p = 0.05
     except:
         select_p = 0.05
-    df_disease_phewas = df_disease_phewas[df_disease_phewas["p-value"] <= select_p]
-    
-    # find the druggable genes
-    # druggable evidence
-    df_disease_phewas = pd.merge(df_disease_phewas, df_druggable, left_on='gene_name', right_on = "sym", how='left')
-    df_disease_phewas['tdl'] = df_disease_phewas['tdl'].fillna("None")
-    df_disease_phewas = df_disease_phewas.rename(columns={'tdl': 'druggability level'})
+
+    # subset the data frame for PheWAS
+    df_disease_phewas = store.query(select_disease, p = select_p, study = "phewas")
+
+    # subset the data frame for phewas phenotype
+    df_disease_phewas = df_disease_phewas[["snp", "gene_name", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
 
     # subset the data by odds ratio
     df_disease_phewas = df_disease_phewas.reset_index().drop("index", axis= 1)
-    df_disease_phewas_sub_des = df_disease_phewas[df_disease_phewas["odds-ratio"] >= 1]
-    df_disease_phewas_sub_pro = df_disease_phewas[df_disease_phewas["odds-ratio"] < 1]
+    df_disease_phewas_sub_des = store.query(select_disease, p = select_p, study = "phewas", direction = "risk")[df_disease_phewas.columns].reset_index().drop("index", axis= 1)
+    df_disease_phewas_sub_pro = store.query(select_disease, p = select_p, study = "phewas", direction = "protective")[df_disease_phewas.columns].reset_index().drop("index", axis= 1)
 
     # count the druggability levels and generate data for pie chart (risk)
     df_tdl_des = df_disease_phewas_sub_des[["gene_name", "druggability level"]].drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
@@ -530,24 +341,15 @@ elif select == "PheWAS":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_phewas, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_phewas)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("PheWAS data:")
             df_disease_phewas = df_disease_phewas[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_phewas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_phewas = df_disease_phewas.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_phewas.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_phewas)
+            download_table(df_disease_phewas, key = "phewas")
+            show_table(df_disease_phewas, key = "phewas", in_expander = True)
 
     st.subheader("Risk alleles (odds ratio > 1)")
     with st.container():
@@ -567,24 +369,15 @@ elif select == "PheWAS":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_phewas_sub_des, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_phewas_sub_des)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("PheWAS data (Odds-ratio >= 1):")
             df_disease_phewas_sub_des = df_disease_phewas_sub_des[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_phewas_sub_des.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_phewas_sub_des = df_disease_phewas_sub_des.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_phewas_sub_des.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_phewas_sub_des)
+            download_table(df_disease_phewas_sub_des, key = "phewas_risk")
+            show_table(df_disease_phewas_sub_des, key = "phewas_risk", in_expander = True)
     
     st.subheader("Protective alleles (odds ratio < 1)")
     with st.container():
@@ -604,48 +397,26 @@ elif select == "PheWAS":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_phewas_sub_pro, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_phewas_sub_pro)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("PheWAS data (Odds-ratio < 1):")
             df_disease_phewas_sub_pro = df_disease_phewas_sub_pro[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_phewas_sub_pro.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_phewas_sub_pro = df_disease_phewas_sub_pro.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_phewas_sub_pro.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_phewas_sub_pro)
+            download_table(df_disease_phewas_sub_pro, key = "phewas_protective")
+            show_table(df_disease_phewas_sub_pro, key = "phewas_protective", in_expander = True)
 
 elif select == "GWAS_PheWAS Union":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the gene variants found in either GWASs or PheWASs or both that are associated with your diseases of interest. It displays all associations, before separating associations into risk and protective.")
     
     # extract diseases
-    disease = ["--"]
-    for i in list(set(df_selected["gwas-associations"].tolist())):
-        disease.extend(i.split(", "))
-    disease.extend(df_selected["phewas phenotype"].tolist())
-    disease = sorted(list(set(disease)))
+    disease = ["--"] + store.vocabulary().union
 
     # sidebar -- disease select box
     select_disease = st.sidebar.selectbox('Disease', disease, key='7')
 
-    # subset the dataframe with the aggregation of phewas and gwas association
-    df_disease_phewas_gwas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease) | df_selected["gwas-associations"].str.contains(select_disease)]
-
-    # subset the data frame for phewas phenotype and gwas association
-    df_disease_phewas_gwas = df_disease_phewas_gwas[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations"]]
-
     # sidebar --  p-value slider
     select_p = st.sidebar.text_input(label = "P-value", help = "Defaults to p = 0.05. Accepts scientific notation, e.g., 5E-4, 3e-9", value = "0.05")
     try:
@@ -655,18 +426,17 @@ elif select == "GWAS_PheWAS Union":
             select_p = 0.05
     except:
         select_p = 0.05
-    df_disease_phewas_gwas = df_disease_phewas_gwas[df_disease_phewas_gwas["p-value"] <= select_p]
-    
-    # look for evidence of druggability    
-    # druggable evidence
-    df_disease_phewas_gwas = pd.merge(df_disease_phewas_gwas, df_druggable, left_on='gene_name', right_on = "sym", how='left')
-    df_disease_phewas_gwas['tdl'] = df_disease_phewas_gwas['tdl'].fillna("None")
-    df_disease_phewas_gwas = df_disease_phewas_gwas.rename(columns={'tdl': 'druggability level'})
+
+    # subset the dataframe with the aggregation of phewas and gwas association
+    df_disease_phewas_gwas = store.query(select_disease, p = select_p, study = "union")
+
+    # subset the data frame for phewas phenotype and gwas association
+    df_disease_phewas_gwas = df_disease_phewas_gwas[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
 
     # subset the data by odds ratio
     df_disease_phewas_gwas = df_disease_phewas_gwas.reset_index().drop("index", axis= 1)
-    df_disease_phewas_gwas_sub_des = df_disease_phewas_gwas[df_disease_phewas_gwas["odds-ratio"] >= 1]
-    df_disease_phewas_gwas_sub_pro = df_disease_phewas_gwas[df_disease_phewas_gwas["odds-ratio"] < 1]
+    df_disease_phewas_gwas_sub_des = store.query(select_disease, p = select_p, study = "union", direction = "risk")[df_disease_phewas_gwas.columns].reset_index().drop("index", axis= 1)
+    df_disease_phewas_gwas_sub_pro = store.query(select_disease, p = select_p, study = "union", direction = "protective")[df_disease_phewas_gwas.columns].reset_index().drop("index", axis= 1)
 
     # count the druggability levels and generate data for pie chart (risk)
     df_tdl_des = df_disease_phewas_gwas_sub_des[["gene_name", "druggability level"]].drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
@@ -693,24 +463,15 @@ elif select == "GWAS_PheWAS Union":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_phewas_gwas, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_phewas_gwas)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("PheWAS+GWAS data:")
             df_disease_phewas_gwas = df_disease_phewas_gwas[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_phewas_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_phewas_gwas = df_disease_phewas_gwas.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_phewas_gwas.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_phewas_gwas)
+            download_table(df_disease_phewas_gwas, key = "union")
+            show_table(df_disease_phewas_gwas, key = "union", in_expander = True)
 
     st.subheader("Risk alleles (odds ratio > 1)")
     with st.container():
@@ -730,24 +491,15 @@ elif select == "GWAS_PheWAS Union":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_phewas_gwas_sub_des, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_phewas_gwas_sub_des)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("PheWAS+GWAS data (Odds-ratio >= 1):")
             df_disease_phewas_gwas_sub_des = df_disease_phewas_gwas_sub_des[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_phewas_gwas_sub_des.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_phewas_gwas_sub_des = df_disease_phewas_gwas_sub_des.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_phewas_gwas_sub_des.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_phewas_gwas_sub_des)
+            download_table(df_disease_phewas_gwas_sub_des, key = "union_risk")
+            show_table(df_disease_phewas_gwas_sub_des, key = "union_risk", in_expander = True)
     
     st.subheader("Protective alleles (odds ratio < 1)")
     with st.container():
@@ -767,38 +519,23 @@ elif select == "GWAS_PheWAS Union":
             fig.update_traces(textposition='inside', textinfo='percent+label', showlegend=False, sort=False, rotation=0)
             st.plotly_chart(fig)
         with col2:
-            fig = px.scatter(df_disease_phewas_gwas_sub_pro, x = "gene_name", y = "odds-ratio", color = "druggability level", hover_name='snp', color_discrete_map = {
-                "None": "rgb(203,213,232)",
-                "Tdark": "rgb(141,160,203)",
-                "Tbio": "rgb(223,217,164)",
-                "Tchem": "rgb(229,134,6)",
-                "Tclin": "#DC3912"},
-                             category_orders = {
-                    "druggability level": ["None", "Tdark", "Tbio", "Tchem", "Tclin"]})
-            # size = [20]*len(df_disease_phewas_gwas),
-            fig.add_hline(y = 1, line_width=1)
+            fig = charts.odds_ratio_scatter(df_disease_phewas_gwas_sub_pro)
             st.plotly_chart(fig, use_container_width= True)
     with st.expander("See data"):
             st.write("PheWAS+GWAS data (Odds-ratio < 1):")
             df_disease_phewas_gwas_sub_pro = df_disease_phewas_gwas_sub_pro[["gene_name", "snp", "odds-ratio", "p-value", "phewas phenotype", "gwas-associations", "druggability level"]]
             df_disease_phewas_gwas_sub_pro.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
             df_disease_phewas_gwas_sub_pro = df_disease_phewas_gwas_sub_pro.reset_index().drop("index", axis= 1)
-            st.markdown(get_table_download_link(df_disease_phewas_gwas_sub_pro.reset_index()), unsafe_allow_html=True)
-            st.write(df_disease_phewas_gwas_sub_pro)
+            download_table(df_disease_phewas_gwas_sub_pro, key = "union_protective")
+            show_table(df_disease_phewas_gwas_sub_pro, key = "union_protective", in_expander = True)
     
 elif select == "GWAS_PheWAS Intersection":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
+    druggable = store.druggability()
     
     st.markdown("This dashboard shows the gene variants found in **both** GWASs and PheWASs that are associated with your diseases of interest. Gene variants that lie in this intersection are then further analysed in their druggability, association odds-ratio, protein-protein interactions and gene ontology term enrichment.")
 
     # extract diseases
-    disease = ["--"]
-    for i in list(set(df_selected["gwas-associations"].tolist())):
-        disease.extend(i.split(", "))
-    phewas_disease_list = list(set(df_selected["phewas phenotype"].tolist()))
-    intersection_list = sorted(list(set(disease) & set(phewas_disease_list)))
+    intersection_list = store.vocabulary().intersection
     
     # sidebar -- disease select box
     select_disease = st.sidebar.selectbox('Disease', intersection_list, key='8')
@@ -812,46 +549,39 @@ elif select == "GWAS_PheWAS Intersection":
             select_p = 0.05
     except:
         select_p = 0.05
-    df_selected = df_selected[df_selected["p-value"] <= select_p]
 
     # subset the data frame for either PheWAS and GWAS
-    df_disease_phewas_or_gwas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease) | df_selected["gwas-associations"].str.contains(select_disease)]
-    df_disease_phewas_or_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
+    df_disease_phewas_or_gwas = store.query(select_disease, p = select_p, study = "union").sort_values(by=['odds-ratio'], ascending=False)
     df_disease_phewas_or_gwas = df_disease_phewas_or_gwas[["snp", "gene_name", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
 
     # subset the data frame for PheWAS
-    df_disease_phewas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease)]
+    df_disease_phewas = store.query(select_disease, p = select_p, study = "phewas")
     df_disease_phewas = df_disease_phewas.reset_index().drop("index", axis= 1)
     #df_disease_phewas["gene_snp"] = df_disease_phewas["gene_name"] + " " + df_disease_phewas['snp']
     df_disease_phewas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
     df_disease_phewas_sub = df_disease_phewas[["snp", "gene_name", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
 
     # subset the data frame for GWAS-associations
-    df_disease_gwas = df_selected[df_selected["gwas-associations"].str.contains(select_disease)]
+    df_disease_gwas = store.query(select_disease, p = select_p, study = "gwas")
     df_disease_gwas = df_disease_gwas.reset_index().drop("index", axis= 1)
     #df_disease_gwas["gene_snp"] = df_disease_gwas["gene_name"] + " " + df_disease_gwas['snp']
     df_disease_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
     df_disease_gwas_sub = df_disease_gwas[["snp", "gene_name", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
 
     # subset the data frame with overlapped phewas and gwas association
-    df_disease_phewas_gwas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease) & df_selected["gwas-associations"].str.contains(select_disease)]
+    df_disease_phewas_gwas = store.query(select_disease, p = select_p, study = "intersection")
     df_disease_phewas_gwas = df_disease_phewas_gwas.reset_index().drop("index", axis= 1)
     #df_disease_phewas_gwas["gene_snp"] = df_disease_phewas_gwas["gene_name"] + " " + df_disease_phewas_gwas['snp']
     df_disease_phewas_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
     df_disease_phewas_gwas_sub = df_disease_phewas_gwas[["snp", "gene_name", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
 
     # find the druggable genes
-    druggable_gene = []
-    for g in df_disease_phewas_gwas["gene_name"].tolist():
-        if g in df_druggable["sym"].tolist():
-            druggable_gene.append(g)
+    is_druggable = druggable.is_target(df_disease_phewas_gwas["gene_name"])
     try:
-        df_disease_phewas_gwas_druggable = df_disease_phewas_gwas[df_disease_phewas_gwas['gene_name'].isin(druggable_gene)].reset_index().drop("index", axis= 1)
+        df_disease_phewas_gwas_druggable = df_disease_phewas_gwas[is_druggable].reset_index().drop("index", axis= 1)
         #df_disease_phewas_gwas_druggable["gene_snp"] = df_disease_phewas_gwas_druggable["gene_name"] + " " + df_disease_phewas_gwas_druggable['snp']
-        df_disease_phewas_gwas_druggable = pd.merge(df_disease_phewas_gwas_druggable,df_druggable, left_on='gene_name', right_on = "sym", how='left')
         df_disease_phewas_gwas_druggable.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
-        df_disease_phewas_gwas_druggable_sub = df_disease_phewas_gwas_druggable[["gene_name", "snp", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations", "tdl"]].reset_index().drop("index", axis= 1)
-        df_disease_phewas_gwas_druggable_sub = df_disease_phewas_gwas_druggable_sub.rename(columns={'tdl': 'druggability level'})
+        df_disease_phewas_gwas_druggable_sub = df_disease_phewas_gwas_druggable[["gene_name", "snp", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations", "druggability level"]].reset_index().drop("index", axis= 1)
         druggable_rate = len(df_disease_phewas_gwas_druggable_sub)/len(df_disease_phewas_gwas_sub)
         non_druggable_count = len(df_disease_phewas_gwas_sub) - len(df_disease_phewas_gwas_druggable_sub)
         non_druggable_rate = non_druggable_count/len(df_disease_phewas_gwas_sub)
@@ -999,61 +729,8 @@ elif select == "GWAS_PheWAS Intersection":
             ]
         }   
         
-        # generate snp, gene, and druggable level data for pie chart
-        df_druglvl = df_druggable[["sym", "tdl"]]
-        df_druglvl = df_druglvl.drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
-        
-        # druggable evidence
-        df_disease_phewas_gwas = pd.merge(df_disease_phewas_gwas, df_druglvl, left_on='gene_name', right_on = "sym", how='left')
-        df_disease_phewas_gwas['tdl'] = df_disease_phewas_gwas['tdl'].fillna("None")
-        df_disease_phewas_gwas = df_disease_phewas_gwas.rename(columns={'tdl': 'druggability level'})
-
         # get the druggable snp and gene data
-        drug_level = df_disease_phewas_gwas["druggability level"].unique().tolist()
-        druggable_data = []
-        for d in drug_level:
-
-            if d == "None":
-                colour = "rgb(203,213,232)"
-            elif d == "Tdark":
-                colour = "rgb(141,160,203)"
-            elif d == "Tbio":
-                colour = "rgb(223,217,164)"
-            elif d == "Tchem":
-                colour = "rgb(229,134,6)"
-            elif d == "Tclin":
-                colour = "#DC3912"
-            
-            gene = df_disease_phewas_gwas[df_disease_phewas_gwas["druggability level"] == d]["gene_name"].unique().tolist()
-            parent = []
-            for i in gene:
-                snp = df_disease_phewas_gwas[df_disease_phewas_gwas["gene_name"] == i]["snp"].unique().tolist()
-                children = []
-                for y in snp:
-                    chil_info = {
-                        "name": y,
-                        "value": df_disease_phewas_gwas[df_disease_phewas_gwas["snp"] == y]["odds-ratio"].tolist()[0],
-                        "itemStyle": {
-                            "color": colour
-                        }
-                    }
-                    children.append(chil_info)
-                child_info = {
-                    "name": i,
-                    "children": children,
-                    "itemStyle": {
-                    "color": colour
-                    }
-                }
-                parent.append(child_info)
-            parant_infor = {
-                "name": d,
-                "children": parent,
-                "itemStyle": {
-                    "color": colour
-                    }
-            }
-            druggable_data.append(parant_infor)
+        druggable_data = charts.sunburst_data(df_disease_phewas_gwas)
         
         option_druggable = {
             "title": {
@@ -1124,20 +801,13 @@ elif select == "GWAS_PheWAS Intersection":
                     st.write("Druggability level of SNPs from PheWAS & GWAS intersection")
                     st_echarts(options= option_druggable, key= '3', height = 400)
 
-        snp_druggable = []
-        for i in range(len(df_disease_phewas_gwas_druggable_sub["snp"])):
-            snp_info = {
-                "value": df_disease_phewas_gwas_druggable_sub["odds-ratio"].tolist()[i],
-                "name": df_disease_phewas_gwas_druggable_sub["snp"].tolist()[i]
-            }
-            snp_druggable.append(snp_info)
+        snp_druggable = charts.echarts_items(df_disease_phewas_gwas_druggable_sub, "snp", "odds-ratio")
 
         with st.container():
             col1, col2= st.columns([1,1])
             with col1:
                 st.write("PheWAS & GWAS intersection alleles odds ratio:")
-                fig = px.scatter(df_disease_phewas_gwas, x = "gene_name", y = "odds-ratio", color = "snp")
-                fig.add_hline(y = 1, line_width=1)
+                fig = charts.odds_ratio_scatter(df_disease_phewas_gwas, color = "snp")
                 st.plotly_chart(fig, use_container_width= True)
             with col2:
                 st.write("Protein-protein interaction network of PheWAS & GWAS intersection alleles:")
@@ -1145,10 +815,7 @@ elif select == "GWAS_PheWAS Intersection":
                 select_gene = df_disease_phewas_gwas["gene_name"].tolist()
                 try:
                     df_protein_interaction = proteins_interaction(input_protein= select_gene)
-                    for i in df_protein_interaction.index:
-                        g.add_node(df_protein_interaction["preferredName_A"][i])
-                        g.add_node(df_protein_interaction["preferredName_B"][i])
-                        g.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i])
+                    network.add_interactions(g, df_protein_interaction, weighted = False)
                 except Exception:
                     pass
                 pv_static(g)
@@ -1157,28 +824,21 @@ elif select == "GWAS_PheWAS Intersection":
             df_disease_phewas_gwas =df_disease_phewas_gwas[["gene_name", "snp", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations", "druggability level"]]
             df_enrichment = go_enrichment(input_gene = df_disease_phewas_gwas_druggable_sub['gene_name'].tolist())
             st.write("GO enrichment analysis")
-            st.markdown(get_table_download_link(df_enrichment.reset_index()), unsafe_allow_html=True)
-            st.dataframe(df_enrichment)
+            download_table(df_enrichment, key = "intersection_go_enrichment")
+            show_table(df_enrichment, key = "intersection_go_enrichment", in_expander = True)
             st.write("PheWAS GWAS intersect data ")
-            st.markdown(get_table_download_link(df_disease_phewas_gwas.reset_index()), unsafe_allow_html=True)
-            st.dataframe(df_disease_phewas_gwas)
+            download_table(df_disease_phewas_gwas, key = "intersection")
+            show_table(df_disease_phewas_gwas, key = "intersection", in_expander = True)
     except:
         st.subheader("No data found. Please try selecting another disease!")
 
 
 elif select == "Protein-protein Interaction":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the protein-protein interaction networks and gene ontology enrichment for your diseases of interest.")
 
     # extract diseases
-    disease = ["--"]
-    for i in list(set(df_selected["gwas-associations"].tolist())):
-        disease.extend(i.split(", "))
-    disease.extend(df_selected["phewas phenotype"].tolist())
-    disease = sorted(list(set(disease)))
+    disease = ["--"] + store.vocabulary().union
 
     # sidebar -- disease select box
     select_disease = st.sidebar.selectbox('Disease', disease, key='9')
@@ -1192,57 +852,49 @@ elif select == "Protein-protein Interaction":
             select_p = 0.05
     except:
         select_p = 0.05
-    df_selected = df_selected[df_selected["p-value"] <= select_p]
 
     # sidebar -- data
     select_study = st.sidebar.selectbox('Study', ["PheWAS + GWAS", "PheWAS", "GWAS"], key='10')
 
     if select_study == "PheWAS + GWAS":
     # subset the data frame for the disease appearing in either PheWAS and GWAS
-        df_disease_phewas_or_gwas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease) | df_selected["gwas-associations"].str.contains(select_disease)]
-        df_disease_phewas_or_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
+        df_disease_phewas_or_gwas = store.query(select_disease, p = select_p, study = "union").sort_values(by=['odds-ratio'], ascending=False)
         df_disease_phewas_or_gwas = df_disease_phewas_or_gwas[["gene_name", "snp", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations"]].reset_index().drop("index", axis= 1)
         df_disease_phewas_or_gwas = df_disease_phewas_or_gwas
     elif select_study == "PheWAS":
-        df_disease_phewas_or_gwas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease)]
+        df_disease_phewas_or_gwas = store.query(select_disease, p = select_p, study = "phewas")
     elif select_study == "GWAS":
-        df_disease_phewas_or_gwas = df_selected[df_selected["gwas-associations"].str.contains(select_disease)]
+        df_disease_phewas_or_gwas = store.query(select_disease, p = select_p, study = "gwas")
 
     # subset the data by odds ratio
     df_disease_phewas_or_gwas = df_disease_phewas_or_gwas.reset_index().drop("index", axis= 1)
-    df_disease_phewas_or_gwas_des = df_disease_phewas_or_gwas[df_disease_phewas_or_gwas["odds-ratio"] >= 1]
-    df_disease_phewas_or_gwas_pro = df_disease_phewas_or_gwas[df_disease_phewas_or_gwas["odds-ratio"] < 1]
+    query_study = {"PheWAS + GWAS": "union", "PheWAS": "phewas", "GWAS": "gwas"}[select_study]
+    df_disease_phewas_or_gwas_des = store.query(select_disease, p = select_p, study = query_study, direction = "risk")[df_disease_phewas_or_gwas.columns]
+    df_disease_phewas_or_gwas_pro = store.query(select_disease, p = select_p, study = query_study, direction = "protective")[df_disease_phewas_or_gwas.columns]
+    if select_study == "PheWAS + GWAS":
+        df_disease_phewas_or_gwas_des = df_disease_phewas_or_gwas_des.sort_values(by=['odds-ratio'], ascending=False)
+        df_disease_phewas_or_gwas_pro = df_disease_phewas_or_gwas_pro.sort_values(by=['odds-ratio'], ascending=False)
+    df_disease_phewas_or_gwas_des = df_disease_phewas_or_gwas_des.reset_index().drop("index", axis= 1)
+    df_disease_phewas_or_gwas_pro = df_disease_phewas_or_gwas_pro.reset_index().drop("index", axis= 1)
 
     
+    # protein-protein network of all genes, the risk and protective networks are its induced subgraphs
+    future_network = sources.submit(proteins_interaction, input_protein= df_disease_phewas_or_gwas["gene_name"].unique().tolist())
+
     # protein-protein network (des genes)
     gene_set = df_disease_phewas_or_gwas_des["gene_name"].unique().tolist()
     g_des=net.Network(width='650px')
     try:
-        df_protein_interaction = proteins_interaction(input_protein= gene_set)
+        df_protein_interaction = network.induced_subnetwork(future_network.result(), gene_set)
         
         # compute the degree of nodes
-        frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
-        dict_frequency_a = dict(frequency_a)
-        frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
-        dict_frequency_b = dict(frequency_b)
-
-        gene_degree = {}
-        for i in gene_set:
-            degree_a = 0 if dict_frequency_a.get(i) is None else dict_frequency_a.get(i)
-            degree_b = 0 if dict_frequency_b.get(i) is None else dict_frequency_b.get(i)
-            gene_degree[i] = degree_a + degree_b
-        df_gene_degree_des = pd.DataFrame(gene_degree.items(), columns=['gene','degree'])
-        df_gene_degree_des.sort_values(by=['degree'], inplace=True, ascending=False)
-        df_gene_degree_des = df_gene_degree_des.set_index('gene')
+        df_gene_degree_des = network.degree_table(df_protein_interaction, gene_set).sort_values(by=['degree'], ascending=False)
 
         # add degree score
-        df_disease_phewas_or_gwas_des = pd.merge(df_disease_phewas_or_gwas_des, df_gene_degree_des, left_on='gene_name', right_on = "gene", how='left')
+        df_disease_phewas_or_gwas_des = pd.merge(df_disease_phewas_or_gwas_des, df_gene_degree_des.reset_index(), left_on='gene_name', right_on = "gene", how='left')
 
         # generate PPI network
-        for i in df_protein_interaction.index:
-            g_des.add_node(df_protein_interaction["preferredName_A"][i], color = "rgb(229,134,6)")
-            g_des.add_node(df_protein_interaction["preferredName_B"][i], color = "rgb(229,134,6)")
-            g_des.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i], weight= df_protein_interaction["score"][i])
+        network.add_interactions(g_des, df_protein_interaction, color = "rgb(229,134,6)")
     except Exception:
         pass
 
@@ -1250,31 +902,16 @@ elif select == "Protein-protein Interaction":
     gene_set = df_disease_phewas_or_gwas_pro["gene_name"].unique().tolist()
     g_pro=net.Network(width='650px')
     try:
-        df_protein_interaction = proteins_interaction(input_protein= gene_set)
+        df_protein_interaction = network.induced_subnetwork(future_network.result(), gene_set)
         
         # compute the degree of nodes
-        frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
-        dict_frequency_a = dict(frequency_a)
-        frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
-        dict_frequency_b = dict(frequency_b)
-
-        gene_degree = {}
-        for i in gene_set:
-            degree_a = 0 if dict_frequency_a.get(i) is None else dict_frequency_a.get(i)
-            degree_b = 0 if dict_frequency_b.get(i) is None else dict_frequency_b.get(i)
-            gene_degree[i] = degree_a + degree_b
-        df_gene_degree_pro = pd.DataFrame(gene_degree.items(), columns=['gene','degree'])
-        df_gene_degree_pro.sort_values(by=['degree'], inplace=True, ascending=False)
-        df_gene_degree_pro = df_gene_degree_pro.set_index('gene')
-        
+        df_gene_degree_pro = network.degree_table(df_protein_interaction, gene_set).sort_values(by=['degree'], ascending=False)
+
         # add degree score
-        df_disease_phewas_or_gwas_pro = pd.merge(df_disease_phewas_or_gwas_pro, df_gene_degree_pro, left_on='gene_name', right_on = "gene", how='left')
+        df_disease_phewas_or_gwas_pro = pd.merge(df_disease_phewas_or_gwas_pro, df_gene_degree_pro.reset_index(), left_on='gene_name', right_on = "gene", how='left')
 
         # generate PPI network
-        for i in df_protein_interaction.index:
-            g_pro.add_node(df_protein_interaction["preferredName_A"][i], color = "rgb(148, 203, 141)")
-            g_pro.add_node(df_protein_interaction["preferredName_B"][i], color = "rgb(148, 203, 141)")
-            g_pro.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i], weight= df_protein_interaction["score"][i])
+        network.add_interactions(g_pro, df_protein_interaction, color = "rgb(148, 203, 141)")
     except Exception:
         pass
 
@@ -1282,31 +919,16 @@ elif select == "Protein-protein Interaction":
     gene_set = df_disease_phewas_or_gwas["gene_name"].unique().tolist()
     g_all=net.Network(width='650px')
     try:
-        df_protein_interaction = proteins_interaction(input_protein= gene_set)
+        df_protein_interaction = future_network.result()
         
         # compute the degree of nodes
-        frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
-        dict_frequency_a = dict(frequency_a)
-        frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
-        dict_frequency_b = dict(frequency_b)
-
-        gene_degree = {}
-        for i in gene_set:
-            degree_a = 0 if dict_frequency_a.get(i) is None else dict_frequency_a.get(i)
-            degree_b = 0 if dict_frequency_b.get(i) is None else dict_frequency_b.get(i)
-            gene_degree[i] = degree_a + degree_b
-        df_gene_degree_all = pd.DataFrame(gene_degree.items(), columns=['gene','degree'])
-        df_gene_degree_all.sort_values(by=['degree'], inplace=True, ascending=False)
-        df_gene_degree_all = df_gene_degree_all.set_index('gene')
-        
+        df_gene_degree_all = network.degree_table(df_protein_interaction, gene_set).sort_values(by=['degree'], ascending=False)
+
         # add degree score
-        df_disease_phewas_or_gwas = pd.merge(df_disease_phewas_or_gwas, df_gene_degree_all, left_on='gene_name', right_on = "gene", how='left')
+        df_disease_phewas_or_gwas = pd.merge(df_disease_phewas_or_gwas, df_gene_degree_all.reset_index(), left_on='gene_name', right_on = "gene", how='left')
 
         # generate PPI network
-        for i in df_protein_interaction.index:
-            g_all.add_node(df_protein_interaction["preferredName_A"][i], color = "rgb(203,213,232)")
-            g_all.add_node(df_protein_interaction["preferredName_B"][i], color = "rgb(203,213,232)")
-            g_all.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i], weight= df_protein_interaction["score"][i])
+        network.add_interactions(g_all, df_protein_interaction, color = "rgb(203,213,232)")
     except Exception:
         pass
 
@@ -1320,10 +942,10 @@ elif select == "Protein-protein Interaction":
                 pv_static(g_all)
             with col2:
                 st.write("Protein network degree")
-                st.dataframe(df_gene_degree_all, height = 520)
+                show_table(df_gene_degree_all, key = "ppi_degree", height = 520)
             with col3:
                 st.write("GO enrichment analysis")
-                st.dataframe(go_enrichment(input_gene = df_disease_phewas_or_gwas['gene_name'].tolist()), height = 520)
+                show_table(go_enrichment(input_gene = df_disease_phewas_or_gwas['gene_name'].tolist()), key = "ppi_go_enrichment", height = 520)
 
         with st.container():
             st.subheader("Risk allele protein-protein interaction network (odds ratio > 1)")
@@ -1332,10 +954,10 @@ elif select == "Protein-protein Interaction":
                 pv_static(g_des)
             with col2:
                 st.write("Protein network degree")
-                st.dataframe(df_gene_degree_des, height = 520)
+                show_table(df_gene_degree_des, key = "ppi_degree_risk", height = 520)
             with col3:
                 st.write("GO enrichment analysis")
-                st.dataframe(go_enrichment(input_gene = df_disease_phewas_or_gwas_des['gene_name'].tolist()), height = 520)
+                show_table(go_enrichment(input_gene = df_disease_phewas_or_gwas_des['gene_name'].tolist()), key = "ppi_go_enrichment_risk", height = 520)
 
         with st.container():
             st.subheader("Protective allele protein-protein interaction network (odds ratio < 1)")
@@ -1344,31 +966,24 @@ elif select == "Protein-protein Interaction":
                 pv_static(g_pro)
             with col2:
                 st.write("Protein network degree")
-                st.dataframe(df_gene_degree_pro, height = 520)
+                show_table(df_gene_degree_pro, key = "ppi_degree_protective", height = 520)
             with col3:
                 st.write("GO enrichment analysis")
-                st.dataframe(go_enrichment(input_gene = df_disease_phewas_or_gwas_pro['gene_name'].tolist()), height = 520)
+                show_table(go_enrichment(input_gene = df_disease_phewas_or_gwas_pro['gene_name'].tolist()), key = "ppi_go_enrichment_protective", height = 520)
     except:
         st.subheader("No data found. Please try selecting another disease!")
 
 elif select == "Disease Target Prioritization":
-    path = os.getcwd()
-    df_selected = pd.read_csv(path + "/assets/df_selected.csv")
-    df_druggable = pd.read_csv(path + "/assets/df_druggable.csv")
     
     st.markdown("This dashboard shows the overall score for target prioritisation of genes with associations with your disease of interest. Features that contribute to the overall score include detection of association and association odds-ratio from a variety of studies (**OpenTargets** and the **PheWAS catalog**), network degree in protein-protein interaction networks (**STRING**), and level of druggability (**Pharos**). ")
 
     try:
         # extract diseases
-        disease = ["--"]
-        for i in list(set(df_selected["gwas-associations"].tolist())):
-            disease.extend(i.split(", "))
-        disease.extend(df_selected["phewas phenotype"].tolist())
-        disease = sorted(list(set(disease)))
+        disease = ["--"] + store.vocabulary().union
 
         # sidebar -- disease select box
         select_disease = st.sidebar.selectbox('Disease', disease, key='11')
-        select_disease = select_disease.split(" (")[0]
+        disease_name = select_disease.split(" (")[0]
 
         # sidebar --  p-value slider
         select_p = st.sidebar.text_input(label = "P-value", help = "Defaults to p = 0.05. Accepts scientific notation, e.g., 5E-4, 3e-9", value = "0.05")
@@ -1379,240 +994,42 @@ elif select == "Disease Target Prioritization":
                 select_p = 0.05
         except:
             select_p = 0.05
-        df_selected = df_selected[df_selected["p-value"] <= select_p]
-        
-        # opentargets gene - disease association score
-        try:
-            df_gene_score = opentargets_gene_score(disease_name= select_disease)
-            #st.write(df_gene_score)
-
-            # add the association score to phewas dataset
-            df_selected = pd.merge(df_selected, df_gene_score, left_on='gene_name', right_on = "gene_symbol", how='left')
-            df_selected['opentargets_associations'] = df_selected['opentargets_associations'].fillna(0)
-        except Exception:
-            df_selected['opentargets_associations'] = 0
-        #st.write(df_selected['opentargets_associations'])
-
-        # subset the data frame for the disease appearing in either PheWAS and GWAS
-        df_disease_phewas_or_gwas = df_selected[df_selected["phewas phenotype"].str.contains(select_disease) | df_selected["gwas-associations"].str.contains(select_disease)]
-        df_disease_phewas_or_gwas.sort_values(by=['odds-ratio'], inplace=True, ascending=False)
-        df_disease_phewas_or_gwas = df_disease_phewas_or_gwas[["gene_name", "snp", "phewas phenotype", "odds-ratio", "p-value", "gwas-associations", "opentargets_associations"]].reset_index().drop("index", axis= 1)
-
-        # add phewas and gwas interaction indicator score look for the genes in the intersection of phewas and gwas association
-        df_disease_phewas_or_gwas = df_disease_phewas_or_gwas.assign(indicator_Phe_GWAS = np.where(df_disease_phewas_or_gwas["phewas phenotype"].str.contains(select_disease) & df_disease_phewas_or_gwas["gwas-associations"].str.contains(select_disease), 1, 0))
-
-        # look for evidence of druggability
-        # druggable evidence
-        df_disease_phewas_or_gwas = pd.merge(df_disease_phewas_or_gwas, df_druggable, left_on='gene_name', right_on = "sym", how='left')
-        
-        # subset the data by odds ratio
-        df_disease_phewas_or_gwas = df_disease_phewas_or_gwas.reset_index().drop("index", axis= 1)
-        df_disease_phewas_or_gwas_des = df_disease_phewas_or_gwas[df_disease_phewas_or_gwas["odds-ratio"] >= 1]
-        df_disease_phewas_or_gwas_pro = df_disease_phewas_or_gwas[df_disease_phewas_or_gwas["odds-ratio"] < 1]
-
-        # add druggable score
-        # risk gene
-        df_tdl_des = df_disease_phewas_or_gwas_des[["gene_name", "tdl"]]
-        df_tdl_des =df_tdl_des.dropna()
-        df_tdl_des = df_tdl_des.drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
-        df_tdl_des = df_tdl_des[df_tdl_des["tdl"] != 'Tdark']
-        df_tdl_des_degree = df_tdl_des.groupby(["gene_name"]).size().reset_index(name='druggability_score')
-        df_disease_phewas_or_gwas_des = pd.merge(df_disease_phewas_or_gwas_des, df_tdl_des_degree, left_on='gene_name', right_on = "gene_name", how='left')
-        df_disease_phewas_or_gwas_des["druggability_score"] = df_disease_phewas_or_gwas_des["druggability_score"].fillna(0)
-        
-        # protective gene
-        df_tdl_pro = df_disease_phewas_or_gwas_pro[["gene_name", "tdl"]]
-        df_tdl_pro =df_tdl_pro.dropna()
-        df_tdl_pro = df_tdl_pro.drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
-        df_tdl_pro = df_tdl_pro[df_tdl_pro["tdl"] != 'Tdark']
-        df_tdl_pro_degree = df_tdl_pro.groupby(["gene_name"]).size().reset_index(name='druggability_score')
-        df_disease_phewas_or_gwas_pro = pd.merge(df_disease_phewas_or_gwas_pro, df_tdl_pro_degree, left_on='gene_name', right_on = "gene_name", how='left')
-        df_disease_phewas_or_gwas_pro["druggability_score"] = df_disease_phewas_or_gwas_pro["druggability_score"].fillna(0)
-
-        # overall gene
-        df_tdl_all = df_disease_phewas_or_gwas[["gene_name", "tdl"]]
-        df_tdl_all =df_tdl_all.dropna()
-        df_tdl_all = df_tdl_all.drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
-        df_tdl_all = df_tdl_all[df_tdl_all["tdl"] != 'Tdark']
-        df_tdl_all_degree = df_tdl_all.groupby(["gene_name"]).size().reset_index(name='druggability_score')
-        df_disease_phewas_or_gwas = pd.merge(df_disease_phewas_or_gwas, df_tdl_all_degree, left_on='gene_name', right_on = "gene_name", how='left')
-        df_disease_phewas_or_gwas["druggability_score"] = df_disease_phewas_or_gwas["druggability_score"].fillna(0)
-
-        # protein-protein network (des genes)
-        gene_set = df_disease_phewas_or_gwas_des["gene_name"].unique().tolist()
-        g_des=net.Network()
-        try:
-            df_protein_interaction = proteins_interaction(input_protein= gene_set)
-            
-            # compute the degree of nodes
-            frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
-            dict_frequency_a = dict(frequency_a)
-            frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
-            dict_frequency_b = dict(frequency_b)
-
-            gene_degree = {}
-            for i in gene_set:
-                degree_a = 0 if dict_frequency_a.get(i) is None else dict_frequency_a.get(i)
-                degree_b = 0 if dict_frequency_b.get(i) is None else dict_frequency_b.get(i)
-                gene_degree[i] = degree_a + degree_b
-            df_gene_degree = pd.DataFrame(gene_degree.items(), columns=['gene', 'networkDegree_score'])
-            
-            # add degree score
-            df_disease_phewas_or_gwas_des = pd.merge(df_disease_phewas_or_gwas_des, df_gene_degree, left_on='gene_name', right_on = "gene", how='left')
-
-            # generate PPI network
-            for i in df_protein_interaction.index:
-                g_des.add_node(df_protein_interaction["preferredName_A"][i], color = "#FF7F7F")
-                g_des.add_node(df_protein_interaction["preferredName_B"][i], color = "#FF7F7F")
-                g_des.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i], weight= df_protein_interaction["score"][i])
-        except Exception:
-            df_disease_phewas_or_gwas_des['networkDegree_score'] = 0
-            pass
-
-        # protein-protein network (pro genes)
-        gene_set = df_disease_phewas_or_gwas_pro["gene_name"].unique().tolist()
-        g_pro=net.Network()
-        try:
-            df_protein_interaction = proteins_interaction(input_protein= gene_set)
-            
-            # compute the degree of nodes
-            frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
-            dict_frequency_a = dict(frequency_a)
-            frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
-            dict_frequency_b = dict(frequency_b)
-
-            gene_degree = {}
-            for i in gene_set:
-                degree_a = 0 if dict_frequency_a.get(i) is None else dict_frequency_a.get(i)
-                degree_b = 0 if dict_frequency_b.get(i) is None else dict_frequency_b.get(i)
-                gene_degree[i] = degree_a + degree_b
-            df_gene_degree = pd.DataFrame(gene_degree.items(), columns=['gene', 'networkDegree_score'])
-            
-            # add degree score
-            df_disease_phewas_or_gwas_pro = pd.merge(df_disease_phewas_or_gwas_pro, df_gene_degree, left_on='gene_name', right_on = "gene", how='left')
-
-            # generate PPI network
-            for i in df_protein_interaction.index:
-                g_pro.add_node(df_protein_interaction["preferredName_A"][i], color = "#45b6fe")
-                g_pro.add_node(df_protein_interaction["preferredName_B"][i], color = "#45b6fe")
-                g_pro.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i], weight= df_protein_interaction["score"][i])
-        except Exception:
-            df_disease_phewas_or_gwas_pro['networkDegree_score'] = 0
-            pass
-
-        # protein-protein network (overall genes)
-        gene_set = df_disease_phewas_or_gwas["gene_name"].unique().tolist()
-        g_all=net.Network()
-        try:
-            df_protein_interaction = proteins_interaction(input_protein= gene_set)
-            
-            # compute the degree of nodes
-            frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
-            dict_frequency_a = dict(frequency_a)
-            frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
-            dict_frequency_b = dict(frequency_b)
-
-            gene_degree = {}
-            for i in gene_set:
-                degree_a = 0 if dict_frequency_a.get(i) is None else dict_frequency_a.get(i)
-                degree_b = 0 if dict_frequency_b.get(i) is None else dict_frequency_b.get(i)
-                gene_degree[i] = degree_a + degree_b
-            df_gene_degree = pd.DataFrame(gene_degree.items(), columns=['gene', 'networkDegree_score'])
-            
-            # add degree score
-            df_disease_phewas_or_gwas = pd.merge(df_disease_phewas_or_gwas, df_gene_degree, left_on='gene_name', right_on = "gene", how='left')
-
-            # generate PPI network
-            for i in df_protein_interaction.index:
-                g_all.add_node(df_protein_interaction["preferredName_A"][i], color = "#45b6fe")
-                g_all.add_node(df_protein_interaction["preferredName_B"][i], color = "#45b6fe")
-                g_all.add_edge(df_protein_interaction["preferredName_A"][i],df_protein_interaction["preferredName_B"][i], weight= df_protein_interaction["score"][i])
-        except Exception:
-            df_disease_phewas_or_gwas['networkDegree_score'] = 0
-            pass
-        
+
         # option to remove features from framework
         featuresList = ["odds-ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]
         feature_remove = st.sidebar.multiselect("Remove: ", featuresList, key='2')
         if len(feature_remove) > 0:
             featuresList = [ele for ele in featuresList if ele not in feature_remove]
-        
-        weight = 1/len(featuresList)
-        # group the data by gene and normalize features (risk)
-        df_disease_phewas_or_gwas_des = df_disease_phewas_or_gwas_des[["gene_name", "odds-ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]]
-        df_disease_phewas_or_gwas_des = df_disease_phewas_or_gwas_des.groupby(["gene_name"]).mean()
-        # normalize by features
-        scaler = preprocessing.MinMaxScaler()
-        names = df_disease_phewas_or_gwas_des.columns
-        ind = df_disease_phewas_or_gwas_des.index
-        d_des = scaler.fit_transform(df_disease_phewas_or_gwas_des)
-        df_disease_phewas_or_gwas_des_norm = pd.DataFrame(d_des, columns = names, index= ind)
-        #df_disease_phewas_or_gwas_des_norm["overall score"] = weight * (df_disease_phewas_or_gwas_des_norm["odds-ratio"] + df_disease_phewas_or_gwas_des_norm["opentargets_associations"] + df_disease_phewas_or_gwas_des_norm["indicator_Phe_GWAS"] + df_disease_phewas_or_gwas_des_norm["druggability_score"] + df_disease_phewas_or_gwas_des_norm["networkDegree_score"])
-        featuresList_des = list(featuresList)
-        df_disease_phewas_or_gwas_des_norm = df_disease_phewas_or_gwas_des_norm[featuresList_des]
-        df_disease_phewas_or_gwas_des_norm["overall score"] = weight * df_disease_phewas_or_gwas_des_norm.sum(axis = 1, skipna = True)
-        #df_disease_phewas_or_gwas_des_norm = df_disease_phewas_or_gwas_des_norm[["overall score", "odds-ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]]
-        featuresList_des.insert(0,"overall score")
-        df_disease_phewas_or_gwas_des_norm = df_disease_phewas_or_gwas_des_norm[featuresList_des]
-        df_disease_phewas_or_gwas_des_norm.sort_values(by=['overall score'], inplace=True, ascending=False)
-
-        # group the data by gene and normalize features (protective)
-        df_disease_phewas_or_gwas_pro["1-odds_ratio"] = 1- df_disease_phewas_or_gwas_pro["odds-ratio"]
-        featuresList_pro =['1-odds_ratio' if i =='odds-ratio' else i for i in featuresList]
-        df_disease_phewas_or_gwas_pro = df_disease_phewas_or_gwas_pro[["gene_name", "1-odds_ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]]
-        df_disease_phewas_or_gwas_pro = df_disease_phewas_or_gwas_pro.groupby(["gene_name"]).mean()
-        # normalize by features
-        scaler = preprocessing.MinMaxScaler()
-        names = df_disease_phewas_or_gwas_pro.columns
-        ind = df_disease_phewas_or_gwas_pro.index
-        d_pro = scaler.fit_transform(df_disease_phewas_or_gwas_pro)
-        df_disease_phewas_or_gwas_pro_norm = pd.DataFrame(d_pro, columns = names, index= ind)
-        #df_disease_phewas_or_gwas_pro_norm["overall score"] = weight * (df_disease_phewas_or_gwas_pro_norm["1-odds_ratio"] + df_disease_phewas_or_gwas_pro_norm["opentargets_associations"] + df_disease_phewas_or_gwas_pro_norm["indicator_Phe_GWAS"] + df_disease_phewas_or_gwas_pro_norm["druggability_score"] + df_disease_phewas_or_gwas_pro_norm["networkDegree_score"])
-        df_disease_phewas_or_gwas_pro_norm = df_disease_phewas_or_gwas_pro_norm[featuresList_pro]
-        df_disease_phewas_or_gwas_pro_norm["overall score"] = weight * df_disease_phewas_or_gwas_pro_norm.sum(axis = 1, skipna = True)
-        #df_disease_phewas_or_gwas_pro_norm = df_disease_phewas_or_gwas_pro_norm[["overall score", "1-odds_ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]]
-        featuresList_pro.insert(0,"overall score")
-        df_disease_phewas_or_gwas_pro_norm = df_disease_phewas_or_gwas_pro_norm[featuresList_pro]
-        df_disease_phewas_or_gwas_pro_norm.sort_values(by=['overall score'], inplace=True, ascending=False)
-        df_disease_phewas_or_gwas_pro_norm = df_disease_phewas_or_gwas_pro_norm.rename(columns = {"overall score": "StarGazer score"})
 
-        
-        # group the data by gene and normalize features (overall)
-        df_disease_phewas_or_gwas = df_disease_phewas_or_gwas[["gene_name", "odds-ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]]
-        df_disease_phewas_or_gwas = df_disease_phewas_or_gwas.groupby(["gene_name"]).mean()
-        # normalize by features
-        scaler = preprocessing.MinMaxScaler()
-        names = df_disease_phewas_or_gwas.columns
-        ind = df_disease_phewas_or_gwas.index
-        d_des = scaler.fit_transform(df_disease_phewas_or_gwas)
-        df_disease_phewas_or_gwas_norm = pd.DataFrame(d_des, columns = names, index= ind)
-        #df_disease_phewas_or_gwas_norm["overall score"] = weight * (df_disease_phewas_or_gwas_norm["odds-ratio"] + df_disease_phewas_or_gwas_norm["opentargets_associations"] + df_disease_phewas_or_gwas_norm["indicator_Phe_GWAS"] + df_disease_phewas_or_gwas_norm["druggability_score"] + df_disease_phewas_or_gwas_norm["networkDegree_score"])
-        featuresList_all = list(featuresList)
-        df_disease_phewas_or_gwas_norm = df_disease_phewas_or_gwas_norm[featuresList_all]
-        df_disease_phewas_or_gwas_norm["overall score"] = weight * df_disease_phewas_or_gwas_norm.sum(axis = 1, skipna = True)
-        #df_disease_phewas_or_gwas_norm = df_disease_phewas_or_gwas_norm[["overall score", "odds-ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]]
-        featuresList_all.insert(0,"overall score")
-        df_disease_phewas_or_gwas_norm = df_disease_phewas_or_gwas_norm[featuresList_all]
-        df_disease_phewas_or_gwas_norm.sort_values(by=['overall score'], inplace=True, ascending=False)
-
-        df_disease_phewas_or_gwas_norm = df_disease_phewas_or_gwas_norm.rename(columns = {"overall score": "StarGazer score"})
-        st.header("Disease: " + "*" + select_disease + "*" + ", P-value <= " + "*" + str(round(select_p, 4)) + "*")
+        # relative weight of each feature in the score
+        with st.sidebar.expander("Feature weights"):
+            feature_weights = {feature: st.slider(feature, 0.0, 1.0, 1.0, 0.05, key = "weight_" + feature) for feature in featuresList}
+
+        # rank the genes, served from the snapshot score table for the default p-value and features
+        ranking = scoring.disease_ranking(select_disease, p = select_p, features = featuresList, weights = feature_weights)
+        if ranking is None:
+            raise LookupError("No association of " + select_disease + " with p-value <= " + str(select_p))
+        df_disease_phewas_or_gwas_norm = ranking["overall"]
+        df_disease_phewas_or_gwas_des_norm = ranking["risk"]
+        df_disease_phewas_or_gwas_pro_norm = ranking["protective"]
+
+        st.header("Disease: " + "*" + disease_name + "*" + ", P-value <= " + "*" + str(round(select_p, 4)) + "*")
 
         # target prioritization data frame
         st.subheader("Overall target prioritization: " + "*" + str(len(df_disease_phewas_or_gwas_norm)) + "* genes")
         with st.container():
-            st.markdown(get_table_download_link(df_disease_phewas_or_gwas_norm.reset_index()), unsafe_allow_html=True)
-            st.dataframe(df_disease_phewas_or_gwas_norm, width = 1100)
+            download_table(df_disease_phewas_or_gwas_norm, key = "prioritization")
+            show_table(df_disease_phewas_or_gwas_norm, key = "prioritization", width = 1100)
 
         st.subheader("Risk allele target prioritization: " + "*" + str(len(df_disease_phewas_or_gwas_des_norm)) + "* genes")
         with st.container():
-            st.markdown(get_table_download_link(df_disease_phewas_or_gwas_des_norm.reset_index()), unsafe_allow_html=True)
-            st.dataframe(df_disease_phewas_or_gwas_des_norm, width = 1100)
+            download_table(df_disease_phewas_or_gwas_des_norm, key = "prioritization_risk")
+            show_table(df_disease_phewas_or_gwas_des_norm, key = "prioritization_risk", width = 1100)
 
         st.subheader("Protective allele target prioritization: " + "*" + str(len(df_disease_phewas_or_gwas_pro_norm)) + "* genes")
         with st.container():
-            st.markdown(get_table_download_link(df_disease_phewas_or_gwas_pro_norm.reset_index()), unsafe_allow_html=True)
-            st.dataframe(df_disease_phewas_or_gwas_pro_norm, width = 1100)
+            download_table(df_disease_phewas_or_gwas_pro_norm, key = "prioritization_protective")
+            show_table(df_disease_phewas_or_gwas_pro_norm, key = "prioritization_protective", width = 1100)
 
     except:
         st.subheader("No data found. Please try selecting another disease!")
@@ -1629,25 +1046,11 @@ elif select == "Disease Target Prioritization":
 else:
     st.markdown("StarGazer is a multi-omics pipeline which integrates several datasets to provide insights into therapeutic target prioritisation. We have integrated data from [OpenTargets](https://www.opentargets.org/) and the [PheWAS catalog](https://phewascatalog.org/phewas) (gene variant risk associations with phenotypic variants), [Pharos](https://pharos.nih.gov/) (druggability of gene target), and [STRING](https://string-db.org/) (protein-protein interaction).")
 
-    # extract GWAS diseases
-    disease = []
-    for i in list(set(df_selected["gwas-associations"].tolist())):
-        disease.extend(i.split(", "))
-    disease = sorted(list(set(disease)))
-    num_gwas = len(disease)
-
-    # extract phewas diseases
-    disease = []
-    disease.extend(df_selected["phewas phenotype"].tolist())
-    disease = sorted(list(set(disease)))
-    num_phewas = len(disease)
-
-    disease = []
-    for i in list(set(df_selected["gwas-associations"].tolist())):
-        disease.extend(i.split(", "))
-    disease.extend(df_selected["phewas phenotype"].tolist())
-    disease = sorted(list(set(disease)))
-    num_phewas_gwas = len(disease)
+    # count GWAS, PheWAS and overall diseases
+    vocabulary = store.vocabulary()
+    num_gwas = len(vocabulary.gwas)
+    num_phewas = len(vocabulary.phewas)
+    num_phewas_gwas = len(vocabulary.union)
 
     st.markdown("#### StarGazer provides various functionalities - users can search by:")
     st.markdown("- Gene")
@@ -0,0 +1 @@
+"""Data layer shared by the StarGazer dashboard (StarGazer.py)."""
@@ -0,0 +1,131 @@
+"""Command line entry point: `python -m stargazer <command>`"""
+import argparse
+import sys
+from stargazer import cache, client, compact, ingest, network, scoring, snapshot, sources, store, stringdb
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "stargazer", description = "StarGazer data and scoring tools")
+    commands = parser.add_subparsers(dest = "command")
+    commands.required = True
+
+    p = commands.add_parser("ingest", help = "build a new data snapshot for the dashboard")
+    p.add_argument("--catalog", default = ingest.PHEWAS_CATALOG, help = "PheWAS catalog CSV (default: assets/phewas-catalog.csv)")
+    p.add_argument("--root", default = snapshot.SNAPSHOT_ROOT, help = "snapshot directory (default: assets/snapshots)")
+    p.add_argument("--keep", type = int, default = 3, help = "number of snapshots to keep (default: 3)")
+    p.add_argument("--scores", action = "store_true", help = "precompute the default StarGazer scores of every disease (fetches OpenTargets and STRING data per disease)")
+    p.add_argument("--workers", type = int, default = None, help = "worker processes for --scores (default and maximum: " + str(client.MAX_PER_HOST) + ", the connections per host)")
+
+    p = commands.add_parser("verify", help = "check the current snapshot against its manifest checksums")
+    p.add_argument("--root", default = snapshot.SNAPSHOT_ROOT, help = "snapshot directory (default: assets/snapshots)")
+
+    p = commands.add_parser("import-string", help = "build the local STRING network store from the bulk download files")
+    p.add_argument("--links", required = True, help = "9606.protein.links file (.txt or .txt.gz)")
+    p.add_argument("--info", required = True, help = "9606.protein.info file (.txt or .txt.gz)")
+    p.add_argument("--out", default = stringdb.STRING_STORE, help = "output file (default: assets/string/9606.arrow)")
+    p.add_argument("--min-score", type = int, default = 150, help = "lowest combined score to keep, 0-1000 (default: 150)")
+
+    p = commands.add_parser("score", help = "rank the genes of diseases of the current snapshot (StarGazer score)")
+    p.add_argument("--disease", action = "append", default = [], help = "disease term as listed on the dashboard; repeat for several diseases")
+    p.add_argument("--disease-file", help = "file with one disease term per line")
+    p.add_argument("--all", action = "store_true", help = "rank every disease of the snapshot")
+    p.add_argument("--p", type = float, default = scoring.DEFAULT_P, help = "p-value threshold (default: 0.05)")
+    p.add_argument("--remove", action = "append", default = [], choices = scoring.FEATURES, help = "feature to leave out of the score; repeatable")
+    p.add_argument("--weight", action = "append", default = [], metavar = "FEATURE=WEIGHT", help = "relative weight of a feature (default: 1 for every feature); repeatable")
+    p.add_argument("--top", type = int, default = None, help = "keep the best N genes per disease and partition (default: all)")
+    p.add_argument("--out", required = True, help = "output file, Parquet (.parquet) or CSV (.csv)")
+    p.add_argument("--skip-degraded", action = "store_true", help = "leave out the diseases whose OpenTargets or STRING lookups failed "
+                   "instead of failing without writing the output")
+    p.add_argument("--workers", type = int, default = None, help = "worker processes (default and maximum: " + str(client.MAX_PER_HOST) + ", the connections per host)")
+
+    p = commands.add_parser("cache", help = "show or clear the response cache of the external sources")
+    p.add_argument("--clear", action = "store_true", help = "remove all cached responses")
+    p.add_argument("--check", action = "store_true", help = "check that the cached fetch functions build their keys as the pages call them (no requests)")
+
+    p = commands.add_parser("bench", help = "run a benchmark against the current snapshot")
+    p.add_argument("target", choices = ["memory", "network"], help = "memory: compact df_selected against plain object/float64 columns; "
+                   "network: bulk degree and pyvis graph construction against per row loops on random networks")
+    p.add_argument("--edges", type = int, default = 5000, help = "network: number of interactions (default: 5000)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        ingest.run(catalog = args.catalog, root = args.root, keep = args.keep, scores = args.scores, workers = args.workers)
+    elif args.command == "verify":
+        directory = snapshot.current_dir(args.root)
+        corrupted = snapshot.verify(directory)
+        if corrupted:
+            print("Checksum mismatch in " + directory + ": " + ", ".join(corrupted))
+            return 1
+        print("Snapshot " + directory + " is intact")
+    elif args.command == "import-string":
+        proteins, interactions = stringdb.import_links(args.links, args.info, out = args.out, min_score = args.min_score)
+        print("Stored " + str(interactions) + " interactions between " + str(proteins) + " proteins in " + args.out)
+    elif args.command == "score":
+        vocabulary = store.vocabulary().union
+        diseases = list(args.disease)
+        if args.disease_file:
+            with open(args.disease_file) as f:
+                diseases += [line.strip() for line in f if line.strip()]
+        if args.all:
+            diseases = vocabulary
+        known = set(vocabulary)
+        unknown = [d for d in diseases if d not in known]
+        if unknown or not diseases:
+            print("Unknown diseases: " + ", ".join(unknown) if unknown else "No disease given, use --disease, --disease-file or --all", file = sys.stderr)
+            return 2
+        features = [f for f in scoring.FEATURES if f not in args.remove]
+        weights = {}
+        for item in args.weight:
+            feature, _, value = item.partition("=")
+            if feature not in scoring.FEATURES:
+                print("Unknown feature in --weight " + item + ", expected one of " + ", ".join(scoring.FEATURES), file = sys.stderr)
+                return 2
+            try:
+                weights[feature] = float(value)
+            except ValueError:
+                print("Weight in --weight " + item + " is not a number", file = sys.stderr)
+                return 2
+        try:
+            scoring.feature_weights(features, weights)
+        except ValueError as e:
+            print(str(e) + " (see --remove and --weight)", file = sys.stderr)
+            return 2
+        ranking = scoring.rank(list(dict.fromkeys(diseases)), p = args.p, features = features, weights = weights, top = args.top, workers = args.workers, log = print)
+        degraded = ranking.attrs["degraded"]
+        if degraded:
+            print("OpenTargets or STRING lookups failed for " + str(len(degraded)) + " diseases: " + ", ".join(degraded), file = sys.stderr)
+            if not args.skip_degraded:
+                print("Nothing written; rerun, or use --skip-degraded to write the other diseases", file = sys.stderr)
+                return 1
+            ranking = ranking[~ranking["disease"].isin(degraded)]
+        ranking = ranking[["disease", "partition", "gene_name", scoring.SCORE] + features]
+        if args.out.endswith(".csv"):
+            ranking.to_csv(args.out, index = False)
+        else:
+            ranking.to_parquet(args.out, index = False)
+        print("Wrote " + str(len(ranking)) + " gene rankings of " + str(ranking["disease"].nunique()) + " diseases to " + args.out)
+    elif args.command == "cache":
+        if args.check:
+            problems = sources.check_keys()
+            for problem in problems:
+                print(problem, file = sys.stderr)
+            if problems:
+                return 1
+            print("Cache keys of the external sources are consistent")
+        if args.clear:
+            cache.clear()
+        for source, info in sorted(cache.stats()["stored"].items()):
+            print(source + ": " + str(info["entries"]) + " responses, " + format(info["bytes"], ",") + " bytes")
+    elif args.command == "bench":
+        if args.target == "memory":
+            report = compact.memory_report(snapshot.read_table("df_selected"))
+            print(report.to_string(formatters = {"plain": "{:,.0f}".format, "compact": "{:,.0f}".format, "reduction": "{:.1%}".format}))
+        elif args.target == "network":
+            report = network.benchmark(edges = args.edges, genes = max(args.edges // 5, 10))
+            print(report.to_string(formatters = {"loop": "{:.4f}s".format, "bulk": "{:.4f}s".format, "speedup": "{:.1f}x".format}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
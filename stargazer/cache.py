@@ -0,0 +1,186 @@
+"""Persistent response cache for the external data sources.
+
+Results of the OpenTargets and STRING lookups are stored in a SQLite file
+keyed by a hash of the normalised request parameters, so a disease that was
+already opened by anyone is served from disk instead of the network. Entries
+expire after a per-source TTL and the least recently used entries are evicted
+once the cache grows beyond MAX_BYTES.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import pyarrow as pa
+import pandas as pd
+from stargazer import snapshot
+
+CACHE_PATH = os.path.join(snapshot.ASSETS_DIR, "cache", "responses.sqlite")
+# seconds before an entry is fetched again
+TTL = {
+    "opentargets": 7 * 24 * 3600,
+    "string": 30 * 24 * 3600,
+}
+MAX_BYTES = 256 * 1024 * 1024
+enabled = True
+
+_local = threading.local()
+_lock = threading.Lock()
+_counters = {}
+
+
+def _connect(path = None):
+    path = path or CACHE_PATH
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+        conn = sqlite3.connect(path, timeout = 30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value BLOB NOT NULL
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        conn.commit()
+        _local.conn, _local.path = conn, path
+    return conn
+
+
+def _count(source, outcome):
+    with _lock:
+        counts = _counters.setdefault(source, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+
+def make_key(source, name, params):
+    """Hash of the source, function name and normalised parameters"""
+    payload = json.dumps([source, name, params], sort_keys = True, default = str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _serialize(df):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index = False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _deserialize(value):
+    return pa.ipc.open_stream(pa.py_buffer(value)).read_all().to_pandas()
+
+
+def get(key, source):
+    """Cached data frame of a key (None if missing or expired)"""
+    conn = _connect()
+    row = conn.execute("SELECT created, value FROM responses WHERE key = ?", (key,)).fetchone()
+    now = time.time()
+    if row is None or now - row[0] > TTL[source]:
+        _count(source, "misses")
+        return None
+    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+    conn.commit()
+    _count(source, "hits")
+    return _deserialize(row[1])
+
+
+def put(key, source, df):
+    value = _serialize(df)
+    now = time.time()
+    conn = _connect()
+    conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", (key, source, now, now, len(value), value))
+    conn.commit()
+    evict()
+
+
+def evict(max_bytes = None):
+    """Drops expired entries, then the least recently used ones until the cache fits max_bytes"""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    conn = _connect()
+    now = time.time()
+    for source, ttl in TTL.items():
+        conn.execute("DELETE FROM responses WHERE source = ? AND created < ?", (source, now - ttl))
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total > max_bytes:
+        # evict down to 90% so that every insert does not trigger an eviction
+        excess = total - int(max_bytes * 0.9)
+        freed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+    conn.commit()
+
+
+def clear():
+    conn = _connect()
+    conn.execute("DELETE FROM responses")
+    conn.commit()
+    with _lock:
+        _counters.clear()
+
+
+def stats():
+    """Hit/miss counters of this process and the entries stored per source"""
+    conn = _connect()
+    stored = {source: {"entries": n, "bytes": size} for source, n, size in
+              conn.execute("SELECT source, COUNT(*), SUM(size) FROM responses GROUP BY source")}
+    with _lock:
+        counters = {source: dict(counts) for source, counts in _counters.items()}
+    return {"counters": counters, "stored": stored}
+
+
+def _complete(df, columns):
+    return isinstance(df, pd.DataFrame) and all(col in df.columns for col in columns)
+
+
+def cached(source, normalize, columns = ()):
+    """Caches the data frames returned by a fetch function.
+    Other return values (e.g. the empty list of a failed lookup) and frames
+    missing one of the expected columns (e.g. a parsed error page) are not
+    cached, and such stored entries count as misses.
+    The key of a call is built from its bound arguments, so positional and keyword
+    calls share entries; wrapper.key(*args, **kwargs) returns it without fetching.
+    in:  source name (see TTL), function mapping the arguments of the fetch function
+         (positionally, in signature order) to normalised key parameters, columns every valid result has
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def call_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return make_key(source, func.__name__, normalize(*bound.args))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            key = wrapper.key(*args, **kwargs)
+            try:
+                df = get(key, source)
+            except sqlite3.Error:
+                return func(*args, **kwargs)
+            if df is not None and _complete(df, columns):
+                return df
+            df = func(*args, **kwargs)
+            if _complete(df, columns):
+                try:
+                    put(key, source, df)
+                except (sqlite3.Error, pa.ArrowException):
+                    pass
+            return df
+        wrapper.key = call_key
+        return wrapper
+    return decorator
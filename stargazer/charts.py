@@ -0,0 +1,100 @@
+"""Plotly charts of the dashboard pages that grow with the number of associations.
+
+Scatter plots of odds ratios are drawn with WebGL (scattergl); above
+MAX_POINTS associations they show one marker per gene at its median odds
+ratio, with the min-max range as error bars. Bar charts of phenotypes keep
+the MAX_BARS bars furthest from an odds ratio of 1.
+"""
+import numpy as np
+import plotly.express as px
+
+MAX_POINTS = 5000
+MAX_BARS = 50
+
+TDL_COLORS = {
+    "None": "rgb(203,213,232)",
+    "Tdark": "rgb(141,160,203)",
+    "Tbio": "rgb(223,217,164)",
+    "Tchem": "rgb(229,134,6)",
+    "Tclin": "#DC3912"}
+TDL_ORDER = ["None", "Tdark", "Tbio", "Tchem", "Tclin"]
+
+
+def gene_ranges(df, color = None):
+    """Odds ratio summary of every gene, in order of first appearance
+    in:  association dataframe, column of the marker colour (kept per gene)
+    out: dataframe (gene_name, colour, min, odds-ratio (median), max, associations, above, below)
+    """
+    keys = ["gene_name"] if color in (None, "gene_name") else ["gene_name", color]
+    summary = df.groupby(keys, sort = False, observed = True)["odds-ratio"].agg(["min", "median", "max", "size"]).reset_index()
+    summary = summary.rename(columns = {"median": "odds-ratio", "size": "associations"})
+    summary["above"] = summary["max"] - summary["odds-ratio"]
+    summary["below"] = summary["odds-ratio"] - summary["min"]
+    return summary
+
+
+def odds_ratio_scatter(df, color = "druggability level", max_points = MAX_POINTS):
+    """Odds ratios by gene, one marker per association or, above max_points, per gene
+    in:  association dataframe (gene_name, snp, odds-ratio, colour column), colour column, point threshold
+    out: plotly figure
+    """
+    options = {}
+    if color == "druggability level":
+        options = {"color_discrete_map": TDL_COLORS, "category_orders": {color: TDL_ORDER}}
+    if len(df) <= max_points:
+        fig = px.scatter(df, x = "gene_name", y = "odds-ratio", color = color, hover_name = "snp", render_mode = "webgl", **options)
+    else:
+        fig = px.scatter(gene_ranges(df, color), x = "gene_name", y = "odds-ratio", color = color, error_y = "above", error_y_minus = "below",
+                         hover_name = "gene_name", hover_data = ["min", "max", "associations"], render_mode = "webgl", **options)
+        fig.update_layout(yaxis_title = "odds-ratio (median and range of " + str(len(df)) + " associations)")
+    fig.add_hline(y = 1, line_width = 1)
+    return fig
+
+
+def top_bars(df, top = MAX_BARS):
+    """The top associations by distance of the odds ratio from 1 (|log odds ratio|), in the order of df"""
+    if len(df) <= top:
+        return df
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        distance = np.abs(np.log(df["odds-ratio"].to_numpy(dtype = np.float64)))
+    distance = np.nan_to_num(distance, nan = -1.0, posinf = np.inf)
+    keep = np.sort(np.argpartition(distance, len(df) - top)[len(df) - top:])
+    return df.iloc[keep]
+
+
+def odds_ratio_bars(df, top = MAX_BARS):
+    """Odds ratios of the phenotypes of a variant, limited to the top bars
+    in:  association dataframe (phewas phenotype, odds-ratio) in display order, number of bars
+    out: plotly figure
+    """
+    shown = top_bars(df, top)
+    fig = px.bar(shown, y = "phewas phenotype", x = "odds-ratio", color = "odds-ratio", color_continuous_scale = px.colors.sequential.RdBu_r,
+                 color_continuous_midpoint = 1, height = min(1000, max(400, 20 * len(shown) + 150)))
+    if len(shown) < len(df):
+        fig.update_layout(title = "Top " + str(len(shown)) + " of " + str(len(df)) + " phenotypes, furthest from odds ratio 1")
+    return fig
+
+
+def sunburst_data(df, level = "druggability level", colors = TDL_COLORS):
+    """ECharts sunburst hierarchy level -> gene -> SNP, valued by the odds ratio of the SNP
+    in:  association dataframe (level column, gene_name, snp, odds-ratio), colour of each level
+    out: list of sunburst nodes, levels and genes in order of first appearance
+    """
+    snp_value = df.drop_duplicates("snp").set_index("snp")["odds-ratio"].to_dict()
+    gene_snps = df.drop_duplicates(["gene_name", "snp"]).groupby("gene_name", sort = False)["snp"].agg(list).to_dict()
+    level_genes = df.drop_duplicates([level, "gene_name"]).groupby(level, sort = False)["gene_name"].agg(list)
+
+    data = []
+    for d, genes in level_genes.items():
+        style = {"color": colors.get(d)}
+        parent = []
+        for gene in genes:
+            children = [{"name": snp, "value": snp_value[snp], "itemStyle": style} for snp in gene_snps[gene]]
+            parent.append({"name": gene, "children": children, "itemStyle": style})
+        data.append({"name": d, "children": parent, "itemStyle": style})
+    return data
+
+
+def echarts_items(df, name, value):
+    """ECharts data items {"value", "name"} of two columns, in row order"""
+    return [{"value": v, "name": n} for n, v in zip(df[name].tolist(), df[value].tolist())]
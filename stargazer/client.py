@@ -0,0 +1,80 @@
+"""Shared HTTP client for the external data sources.
+
+Every source gets a keep-alive session (connections are pooled and reused
+across reruns and sessions), a connect/read timeout, bounded retries with
+exponential backoff on connection errors and 429/5xx responses, and all
+requests to one host share a concurrency cap.
+"""
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds and number of retries per source
+SOURCES = {
+    "opentargets": {"timeout": (5, 30), "retries": 3},
+    "string": {"timeout": (5, 60), "retries": 3},
+    "gwas_catalog": {"timeout": (5, 60), "retries": 3},
+    "pharos": {"timeout": (10, 180), "retries": 2},
+}
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+POOL_SIZE = 8
+# concurrent requests allowed per host
+MAX_PER_HOST = 4
+
+_lock = threading.Lock()
+_sessions = {}
+_host_slots = {}
+
+
+def _session(source):
+    session = _sessions.get(source)
+    if session is None:
+        with _lock:
+            session = _sessions.get(source)
+            if session is None:
+                retry = Retry(
+                    total = SOURCES[source]["retries"],
+                    backoff_factor = BACKOFF_FACTOR,
+                    status_forcelist = RETRY_STATUS,
+                    # the POST calls are read-only queries, safe to repeat
+                    allowed_methods = None,
+                    raise_on_status = False,
+                    respect_retry_after_header = True,
+                )
+                adapter = HTTPAdapter(pool_connections = POOL_SIZE, pool_maxsize = POOL_SIZE, max_retries = retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[source] = session
+    return session
+
+
+@contextmanager
+def _host_slot(url):
+    host = urlsplit(url).netloc
+    with _lock:
+        slot = _host_slots.setdefault(host, threading.BoundedSemaphore(MAX_PER_HOST))
+    with slot:
+        yield
+
+
+def request(source, method, url, **kwargs):
+    """Sends a request through the pooled session of a source
+    in:  source name (see SOURCES), HTTP method, url, requests keyword arguments
+    out: requests Response
+    """
+    kwargs.setdefault("timeout", SOURCES[source]["timeout"])
+    with _host_slot(url):
+        return _session(source).request(method, url, **kwargs)
+
+
+def get(source, url, **kwargs):
+    return request(source, "GET", url, **kwargs)
+
+
+def post(source, url, **kwargs):
+    return request(source, "POST", url, **kwargs)
@@ -0,0 +1,64 @@
+"""Compact in-memory representation of the snapshot tables.
+
+The string columns of df_selected are dictionary encoded (pandas categoricals,
+int32 indices in the Arrow file), odds ratios are float32 and the Pharos
+target development level, in df_druggable and joined onto every association
+of df_selected as its druggability level, is an int8 ordered category. p-values stay float64
+because GWAS p-values go far below the smallest float32 (~1e-38).
+
+Pages work on decoded subsets (see decode) so that plotting, merging and
+grouping behave exactly as with the CSV-loaded frames.
+"""
+import numpy as np
+import pandas as pd
+
+# druggability levels, "None" standing for genes without a Pharos target
+TDL_LEVELS = ["None", "Tdark", "Tbio", "Tchem", "Tclin"]
+CATEGORICAL = ["gene_name", "snp", "phewas phenotype", "gwas-associations"]
+DRUGGABILITY = "druggability level"
+
+
+def encode_selected(df):
+    df = df.copy()
+    for col in CATEGORICAL:
+        df[col] = df[col].astype("category")
+    df["odds-ratio"] = df["odds-ratio"].astype(np.float32)
+    df[DRUGGABILITY] = pd.Categorical(df[DRUGGABILITY], categories = TDL_LEVELS, ordered = True)
+    return df
+
+
+def encode_druggable(df):
+    df = df[["sym", "tdl"]].copy()
+    df["tdl"] = pd.Categorical(df["tdl"], categories = TDL_LEVELS, ordered = True)
+    return df
+
+
+def decode(df):
+    """Turns the categorical and float32 columns of a subset back into object and float64 columns
+    in:  dataframe
+    out: dataframe
+    """
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            columns[col] = s.astype(object)
+        elif s.dtype == np.float32:
+            # shortest float32 repr, so 1.23 comes back as 1.23 and not 1.2300000190734863
+            columns[col] = pd.Series(s.to_numpy().astype(str).astype(np.float64), index = s.index)
+    return df.assign(**columns) if columns else df
+
+
+def memory_report(df):
+    """Memory of a compact table against the same data loaded as plain object / float64 columns
+    in:  compact dataframe
+    out: dataframe of plain and compact bytes per column and in total
+    """
+    plain = decode(df)
+    report = pd.DataFrame({
+        "plain": plain.memory_usage(deep = True, index = False),
+        "compact": df.memory_usage(deep = True, index = False),
+    })
+    report.loc["total"] = report.sum()
+    report["reduction"] = 1 - report["compact"] / report["plain"]
+    return report
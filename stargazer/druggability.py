@@ -0,0 +1,60 @@
+"""Druggability of genes from the Pharos target development levels (tdl).
+
+The lookup hashes the Pharos symbols once per snapshot (store.druggability)
+and answers whole gene columns at a time, for the page charts and for the
+druggability_score feature of the StarGazer score.
+"""
+import numpy as np
+import pandas as pd
+from stargazer.compact import TDL_LEVELS
+
+NONE = TDL_LEVELS.index("None")
+TDARK = TDL_LEVELS.index("Tdark")
+
+
+class Druggability:
+    """Symbol -> druggability lookup of a df_druggable table (sym, tdl), compact or decoded"""
+
+    def __init__(self, df_druggable):
+        df = df_druggable.loc[df_druggable["sym"].notna(), ["sym", "tdl"]].drop_duplicates()
+        codes, symbols = pd.factorize(df["sym"].astype(object).to_numpy())
+        self.symbols = pd.Index(symbols)
+        tdl = pd.Categorical(df["tdl"].astype(object), categories = TDL_LEVELS, ordered = True).codes.astype(np.int64)
+
+        # highest level of every symbol ("None" if Pharos has no level) and its number of levels other than Tdark
+        self._level = np.full(len(self.symbols) + 1, NONE, dtype = np.int8)
+        np.maximum.at(self._level, codes, np.where(tdl < 0, NONE, tdl).astype(np.int8))
+        self._score = np.bincount(codes, weights = (tdl >= 0) & (tdl != TDARK), minlength = len(self.symbols) + 1)
+        self._labels = np.asarray(TDL_LEVELS, dtype = object)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _positions(self, genes):
+        # position of every gene among the symbols, unknown genes on the trailing "None" slot
+        positions = self.symbols.get_indexer(pd.Index(np.asarray(genes, dtype = object)))
+        return np.where(positions < 0, len(self.symbols), positions)
+
+    def is_target(self, genes):
+        """Whether every gene is a Pharos target
+        out: boolean array
+        """
+        return self._positions(genes) < len(self.symbols)
+
+    def codes(self, genes):
+        """TDL code (position in TDL_LEVELS) of every gene, "None" for genes without a level
+        out: int8 array
+        """
+        return self._level[self._positions(genes)]
+
+    def levels(self, genes):
+        """Druggability level name of every gene, "None" for genes without a level
+        out: object array
+        """
+        return self._labels[self.codes(genes)]
+
+    def scores(self, genes):
+        """druggability_score of every gene: number of distinct levels other than Tdark
+        out: float array
+        """
+        return self._score[self._positions(genes)]
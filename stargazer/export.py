@@ -0,0 +1,48 @@
+"""Serialisation of the dashboard tables for download.
+
+Tables are only serialised when a download is requested, in one of FORMATS:
+gzip-compressed CSV, written chunk by chunk so the full CSV text is never
+held in memory, or Parquet.
+"""
+import gzip
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CHUNK_ROWS = 50000
+
+# format -> (file extension, mime type)
+FORMATS = {
+    "CSV.gz": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def csv_gz(df, chunk_rows = CHUNK_ROWS):
+    """Gzip-compressed CSV of a dataframe (with its index), serialised in chunks of rows
+    out: bytes
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj = buffer, mode = "wb") as gz:
+        with io.TextIOWrapper(gz, encoding = "utf-8", newline = "") as text:
+            for start in range(0, max(len(df), 1), chunk_rows):
+                df.iloc[start:start + chunk_rows].to_csv(text, index = True, header = start == 0)
+    return buffer.getvalue()
+
+
+def parquet(df):
+    """Parquet file of a dataframe (with its index)
+    out: bytes
+    """
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index = True), buffer)
+    return buffer.getvalue()
+
+
+def to_bytes(df, format):
+    """Serialised dataframe in one of FORMATS
+    out: bytes, file extension, mime type
+    """
+    extension, mime = FORMATS[format]
+    data = csv_gz(df) if format == "CSV.gz" else parquet(df)
+    return data, extension, mime
@@ -0,0 +1,179 @@
+"""Lookup indexes over the association table, built at ingest time.
+
+A term index maps every disease term to the row ids of df_selected where it
+appears, stored as Arrow list columns (term, rows, p), i.e. a CSR layout
+that can be memory-mapped with the rest of the snapshot. The rows of a term
+are ordered by p-value and the p column holds their p-values, so a p-value
+threshold is a binary search for a prefix of the posting list. Lookups are
+exact matches on the term and cost O(log matches + returned rows).
+
+df_selected itself is clustered on snp and then p-value, so the rows of a
+variant form one contiguous, p-sorted slice; the variant index stores that
+slice per SNP together with the sorted SNPs of every gene.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# snapshot tables holding the term indexes and the disease vocabulary
+GWAS_INDEX = "index_gwas"
+PHEWAS_INDEX = "index_phewas"
+VOCABULARY = "vocabulary"
+SNP_INDEX = "index_snp"
+GENE_INDEX = "index_gene"
+
+
+def cluster_by_snp(df_selected):
+    """Orders the association table by snp (then p-value and gene) so each variant is one p-sorted slice"""
+    return df_selected.sort_values(["snp", "p-value", "gene_name"], kind = "mergesort", na_position = "last").reset_index(drop = True)
+
+
+def build_variant_indexes(df_selected):
+    """SNP -> row slice and gene -> sorted SNPs indexes of a table clustered by cluster_by_snp
+    out: dict of pyarrow Tables (snp, start, stop) and (gene, snps)
+    """
+    snp = df_selected["snp"]
+    snp = snp[:int(snp.notna().sum())]
+    codes, snps = pd.factorize(snp, sort = True)
+    counts = np.bincount(codes, minlength = len(snps))
+    stops = np.cumsum(counts)
+    snp_table = pa.table({
+        "snp": pa.array(list(snps), type = pa.string()),
+        "start": pa.array(stops - counts, type = pa.int32()),
+        "stop": pa.array(stops, type = pa.int32()),
+    })
+
+    pairs = df_selected[["gene_name", "snp"]].dropna().drop_duplicates().sort_values(["gene_name", "snp"], kind = "mergesort")
+    gene_codes, genes = pd.factorize(pairs["gene_name"], sort = True)
+    offsets = np.zeros(len(genes) + 1, dtype = np.int32)
+    np.cumsum(np.bincount(gene_codes, minlength = len(genes)), out = offsets[1:])
+    gene_table = pa.table({
+        "gene": pa.array(list(genes), type = pa.string()),
+        "snps": pa.ListArray.from_arrays(pa.array(offsets, type = pa.int32()), pa.array(pairs["snp"].tolist(), type = pa.string())),
+    })
+    return {SNP_INDEX: snp_table, GENE_INDEX: gene_table}
+
+
+def build_term_index(values, p_values, sep = None):
+    """Builds a term -> row ids index, each posting list ordered by p-value
+    in:  series of terms per row (row id = position), p-value per row, separator of multi-term cells
+    out: pyarrow Table with a term column and lists of row ids and of their p-values per term
+    """
+    values = pd.Series(np.asarray(values, dtype = object))
+    if sep is not None:
+        values = values.str.split(sep).explode()
+    row = values.index.values.astype(np.int32)
+    pairs = pd.DataFrame({"term": values.values, "row": row, "p": np.asarray(p_values, dtype = np.float64)[row]})
+    pairs = pairs.dropna(subset = ["term"]).drop_duplicates(["term", "row"]).sort_values(["term", "p", "row"], kind = "mergesort", na_position = "last")
+    codes, terms = pd.factorize(pairs["term"], sort = True)
+    offsets = pa.array(np.r_[0, np.cumsum(np.bincount(codes, minlength = len(terms)))].astype(np.int32), type = pa.int32())
+    return pa.table({
+        "term": pa.array(list(terms), type = pa.string()),
+        "rows": pa.ListArray.from_arrays(offsets, pa.array(pairs["row"].values, type = pa.int32())),
+        "p": pa.ListArray.from_arrays(offsets, pa.array(pairs["p"].values, type = pa.float64())),
+    })
+
+
+def build_disease_indexes(df_selected):
+    """Term indexes of the comma-split GWAS associations and the PheWAS phenotypes"""
+    return {
+        GWAS_INDEX: build_term_index(df_selected["gwas-associations"], df_selected["p-value"], sep = ", "),
+        PHEWAS_INDEX: build_term_index(df_selected["phewas phenotype"], df_selected["p-value"]),
+    }
+
+
+def build_vocabulary(indexes):
+    """Disease terms with their number of GWAS and PheWAS rows
+    in:  dict of the term index tables (see build_disease_indexes)
+    out: pyarrow Table (term, gwas_rows, phewas_rows), sorted by term
+    """
+    counts = []
+    for name, column in ((GWAS_INDEX, "gwas_rows"), (PHEWAS_INDEX, "phewas_rows")):
+        table = indexes[name]
+        offsets = table.column("rows").combine_chunks().offsets.to_numpy()
+        counts.append(pd.Series(np.diff(offsets), index = table.column("term").to_pylist(), name = column))
+    df = pd.concat(counts, axis = 1).fillna(0).astype(np.int32).sort_index()
+    df.index.name = "term"
+    return pa.Table.from_pandas(df.reset_index(), preserve_index = False)
+
+
+class Vocabulary:
+    """Sorted disease lists of the dropdowns, shared by all pages"""
+
+    def __init__(self, table):
+        df = table.to_pandas()
+        in_gwas = df["gwas_rows"] > 0
+        in_phewas = df["phewas_rows"] > 0
+        self.gwas = df.loc[in_gwas, "term"].tolist()
+        self.phewas = df.loc[in_phewas, "term"].tolist()
+        self.union = df["term"].tolist()
+        self.intersection = df.loc[in_gwas & in_phewas, "term"].tolist()
+        self.counts = df.set_index("term")
+
+    @property
+    def nbytes(self):
+        return int(self.counts.memory_usage(deep = True).sum())
+
+
+class TermIndex:
+    """In-process view of a term index table"""
+
+    def __init__(self, table):
+        if "p" not in table.column_names:
+            raise ValueError("The snapshot predates p-value sorted indexes, run `python -m stargazer ingest` to rebuild it")
+        rows = table.column("rows").combine_chunks()
+        self.terms = table.column("term").to_pylist()
+        self._position = {term: i for i, term in enumerate(self.terms)}
+        self._offsets = rows.offsets.to_numpy()
+        self._rows = rows.flatten().to_numpy()
+        self._p = table.column("p").combine_chunks().flatten().to_numpy()
+
+    def __contains__(self, term):
+        return term in self._position
+
+    def __len__(self):
+        return len(self.terms)
+
+    @property
+    def nbytes(self):
+        return self._offsets.nbytes + self._rows.nbytes + self._p.nbytes
+
+    def lookup(self, term, p = None):
+        """Row ids of df_selected matching the term exactly, by increasing p-value (empty if unknown)
+        in:  term, p-value threshold (all rows if None)
+        """
+        i = self._position.get(term)
+        if i is None:
+            return np.empty(0, dtype = np.int32)
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        if p is not None:
+            stop = start + int(np.searchsorted(self._p[start:stop], p, side = "right"))
+        return self._rows[start:stop]
+
+
+class VariantIndex:
+    """In-process view of the SNP and gene indexes"""
+
+    def __init__(self, snp_table, gene_table):
+        snps = gene_table.column("snps").combine_chunks()
+        self.snps = snp_table.column("snp").to_pylist()
+        self._slices = dict(zip(self.snps, zip(snp_table.column("start").to_pylist(), snp_table.column("stop").to_pylist())))
+        self.genes = gene_table.column("gene").to_pylist()
+        self._position = {gene: i for i, gene in enumerate(self.genes)}
+        self._offsets = snps.offsets.to_numpy()
+        self._gene_snps = snps.flatten().to_numpy(zero_copy_only = False)
+
+    @property
+    def nbytes(self):
+        return self._offsets.nbytes + self._gene_snps.nbytes
+
+    def gene_variants(self, gene):
+        """Sorted SNPs of a gene (empty if unknown)"""
+        i = self._position.get(gene)
+        if i is None:
+            return []
+        return self._gene_snps[self._offsets[i]:self._offsets[i + 1]].tolist()
+
+    def variant_rows(self, snp):
+        """Slice of df_selected holding the rows of a SNP (empty if unknown)"""
+        return slice(*self._slices.get(snp, (0, 0)))
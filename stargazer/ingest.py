@@ -0,0 +1,143 @@
+"""Builds the StarGazer data snapshot from the PheWAS catalog and remote sources.
+
+Run with `python -m stargazer ingest`; the dashboard only reads the result.
+"""
+import os
+import pandas as pd
+from stargazer import client, compact, druggability, index, scoring, snapshot
+
+PHEWAS_CATALOG = os.path.join(snapshot.ASSETS_DIR, "phewas-catalog.csv")
+COVID_URL = "https://www.ebi.ac.uk/gwas/rest/api/efoTraits/MONDO_0100096/associations?projection=associationByEfoTrait"
+PHAROS_URL = "https://pharos-api.ncats.io/graphql"
+
+
+def load_phewas_catalog(path = PHEWAS_CATALOG):
+    # import dataset
+    df = pd.read_csv(path)
+
+    # fill na with "Unknown"
+    df['gene_name'] = df['gene_name'].fillna("UNKNOWN")
+    return df[["gene_name", "snp", "phewas phenotype", "p-value", "odds-ratio", "gwas-associations"]]
+
+
+def fetch_covid_associations():
+    """COVID-19 associations (MONDO_0100096) from the GWAS Catalog, in the PheWAS catalog layout"""
+    r = client.get("gwas_catalog", COVID_URL, json={})
+    r.raise_for_status()
+    COVID_df = pd.json_normalize(r.json()["_embedded"]["associations"], ["snps", ["genomicContexts"]], ["orPerCopyNum", "pvalue"], errors = "ignore")[["gene.geneName", "pvalue", "_links.snp.href", "orPerCopyNum"]].drop_duplicates(keep = "first")
+    COVID_df["_links.snp.href"] = COVID_df["_links.snp.href"].str.strip("{?projection}").str.split("Polymorphisms/").str[1]
+    COVID_df = COVID_df.loc[COVID_df["orPerCopyNum"].notna(), :].reset_index(drop = True)
+    COVID_df["orPerCopyNum"] = COVID_df["orPerCopyNum"].astype(float)
+    COVID_df = COVID_df.rename({
+        "gene.geneName": "gene_name",
+        "pvalue": "p-value",
+        "_links.snp.href": "snp",
+        "orPerCopyNum": "odds-ratio"
+    }, axis = 1)
+    COVID_df[["phewas phenotype", "gwas-associations"]] = "COVID-19"
+    return COVID_df
+
+
+def fetch_pharos_targets():
+    """Target development level (tdl) of every Pharos target"""
+    query_string = """
+    query AllTargets {
+        targets(
+            filter: {
+              facets: [{
+                  facet: "Target Development Level",
+                    values: ["Tclin", "Tchem", "Tbio", "Tdark"]
+                }]
+            }
+        ) {
+            targets (top : 100000) {
+                sym
+                tdl
+            }
+        }
+    }
+    """
+    r = client.post("pharos", PHAROS_URL, json={"query": query_string})
+    r.raise_for_status()
+    return pd.DataFrame(r.json()["data"]["targets"]["targets"]).drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
+
+
+def build_tables(catalog = PHEWAS_CATALOG, root = snapshot.SNAPSHOT_ROOT, log = print):
+    """Assembles the snapshot tables
+    in:  path of the PheWAS catalog CSV, snapshot root (for fallbacks)
+    out: dict of table name -> dataframe, dict of source notes for the manifest
+    """
+    sources = {"phewas_catalog": os.path.basename(catalog)}
+    df_selected = load_phewas_catalog(catalog)
+
+    # Adding COVID-19 module
+    try:
+        df_selected = pd.concat([df_selected, fetch_covid_associations()]).reset_index(drop = True)
+        sources["covid19"] = COVID_URL
+    except Exception as e:
+        log("GWAS Catalog COVID-19 associations unavailable, skipping: " + str(e))
+
+    # extract data from Pharos, falling back to the current snapshot
+    try:
+        df_druggable = fetch_pharos_targets()
+        sources["pharos"] = PHAROS_URL
+    except Exception as e:
+        previous = snapshot.current_version(root)
+        if previous is None:
+            raise
+        log("Pharos unavailable, reusing the druggability table of snapshot " + previous + ": " + str(e))
+        df_druggable = snapshot.read_table("df_druggable", os.path.join(root, previous))
+        sources["pharos"] = "snapshot " + previous
+
+    # join the Pharos level of every gene once, so the pages need no merge
+    df_selected[compact.DRUGGABILITY] = druggability.Druggability(df_druggable).levels(df_selected["gene_name"])
+
+    # row ids of the indexes are positions in the clustered df_selected
+    df_selected = index.cluster_by_snp(df_selected)
+    tables = {"df_selected": compact.encode_selected(df_selected), "df_druggable": compact.encode_druggable(df_druggable)}
+    tables.update(index.build_variant_indexes(df_selected))
+    indexes = index.build_disease_indexes(df_selected)
+    tables.update(indexes)
+    tables[index.VOCABULARY] = index.build_vocabulary(indexes)
+    return tables, sources
+
+
+def build_scores(tables, workers = None, log = print):
+    """Default rankings (p <= scoring.DEFAULT_P, all features) of every disease of the snapshot tables.
+    Diseases whose OpenTargets or STRING lookup failed are left out of the table, so the
+    Prioritization page computes them live.
+    out: dataframe of the score table, list of the diseases left out
+    """
+    diseases = index.Vocabulary(tables[index.VOCABULARY]).union
+    ranking = scoring.score_diseases(
+        diseases,
+        tables["df_selected"],
+        index.TermIndex(tables[index.GWAS_INDEX]),
+        index.TermIndex(tables[index.PHEWAS_INDEX]),
+        druggability.Druggability(tables["df_druggable"]),
+        p = scoring.DEFAULT_P,
+        workers = workers,
+        log = log,
+    )
+    incomplete = ranking.attrs["degraded"]
+    if incomplete:
+        log("Left " + str(len(incomplete)) + " diseases out of the score table, OpenTargets or STRING lookups failed: " + ", ".join(incomplete))
+        ranking = ranking[~ranking["disease"].isin(incomplete)].reset_index(drop = True)
+    ranking["gene_name"] = ranking["gene_name"].astype("category")
+    return ranking, incomplete
+
+
+def run(catalog = PHEWAS_CATALOG, root = snapshot.SNAPSHOT_ROOT, keep = 3, scores = False, workers = None, log = print):
+    """Builds and publishes a new snapshot
+    in:  PheWAS catalog, snapshot root, snapshots to keep, whether to precompute the score table, worker processes
+    out: directory of the new snapshot
+    """
+    tables, sources = build_tables(catalog, root, log = log)
+    meta = {"sources": sources}
+    if scores:
+        tables[scoring.SCORE_TABLE], meta["scores_incomplete"] = build_scores(tables, workers = workers, log = log)
+    directory = snapshot.publish(tables, root = root, meta = meta)
+    log("Published snapshot " + directory)
+    for version in snapshot.prune(keep, root):
+        log("Removed old snapshot " + version)
+    return directory
@@ -0,0 +1,141 @@
+"""Protein-protein interaction networks of the dashboard pages.
+
+The network of all genes of a disease is fetched once; the risk and
+protective networks are derived from it as induced subgraphs. Node degrees
+and the pyvis graphs are computed from the interaction table in bulk.
+"""
+import collections
+import time
+import numpy as np
+import pandas as pd
+
+
+def induced_subnetwork(df_protein_interaction, genes):
+    """Interactions whose two proteins are both in a gene set
+    in:  interaction data frame (preferredName_A, preferredName_B, ...), list of genes
+    out: dataframe
+    """
+    genes = set(genes)
+    keep = df_protein_interaction["preferredName_A"].isin(genes) & df_protein_interaction["preferredName_B"].isin(genes)
+    return df_protein_interaction[keep].reset_index(drop = True)
+
+
+def degree_table(df_protein_interaction, genes):
+    """Degree and weighted degree (sum of the STRING scores) of genes in a network
+    in:  interaction data frame, list of genes
+    out: dataframe indexed by gene (in the order of genes) with columns degree and weighted_degree
+    """
+    genes = pd.unique(np.asarray(genes, dtype = object))
+    ends = np.concatenate([genes,
+                           df_protein_interaction["preferredName_A"].to_numpy(dtype = object),
+                           df_protein_interaction["preferredName_B"].to_numpy(dtype = object)])
+    scores = df_protein_interaction["score"].to_numpy(dtype = np.float64)
+
+    # the genes come first, so their codes are 0..len(genes) - 1
+    codes, names = pd.factorize(ends)
+    codes = codes[len(genes):]
+    degree = np.bincount(codes, minlength = len(names))[:len(genes)]
+    weighted_degree = np.bincount(codes, weights = np.concatenate([scores, scores]), minlength = len(names))[:len(genes)]
+    return pd.DataFrame({"degree": degree, "weighted_degree": weighted_degree}, index = pd.Index(genes, name = "gene"))
+
+
+def add_interactions(g, df_protein_interaction, color = None, weighted = True):
+    """Adds the proteins and interactions of a network to an empty pyvis graph.
+    Fills the node and edge lists the way Network.add_node/add_edge do, without
+    their scan of all existing nodes and edges for every new edge.
+    in:  pyvis Network, interaction data frame, node colour, whether edges carry the score as weight
+    out: the graph
+    """
+    a = df_protein_interaction["preferredName_A"].to_numpy(dtype = object)
+    b = df_protein_interaction["preferredName_B"].to_numpy(dtype = object)
+
+    # nodes in order of first appearance
+    ends = np.empty(2 * len(a), dtype = object)
+    ends[0::2], ends[1::2] = a, b
+    for name in pd.unique(ends):
+        if name in g.node_map:
+            continue
+        options = {} if color is None else {"color": color}
+        options.update({"id": name, "label": name, "shape": "dot"})
+        if g.font_color:
+            options["font"] = {"color": g.font_color}
+        g.nodes.append(options)
+        g.node_ids.append(name)
+        g.node_map[name] = options
+
+    # an undirected graph keeps one edge per protein pair
+    keep = np.ones(len(a), dtype = bool)
+    if not g.directed and len(a):
+        pairs = pd.DataFrame({"low": np.where(a <= b, a, b), "high": np.where(a <= b, b, a)})
+        keep = ~pairs.duplicated().to_numpy()
+    scores = df_protein_interaction["score"].tolist() if weighted else None
+    for i in np.flatnonzero(keep):
+        options = {"weight": scores[i]} if weighted else {}
+        options.update({"from": a[i], "to": b[i]})
+        if g.directed:
+            options["arrows"] = "to"
+        g.edges.append(options)
+    return g
+
+
+def _loop_degree(df_protein_interaction, genes):
+    # per gene Counter lookups, as the pages used to compute the degree
+    frequency_a = collections.Counter(df_protein_interaction["preferredName_A"].tolist())
+    frequency_b = collections.Counter(df_protein_interaction["preferredName_B"].tolist())
+    gene_degree = {i: frequency_a.get(i, 0) + frequency_b.get(i, 0) for i in genes}
+    return pd.DataFrame(gene_degree.items(), columns = ["gene", "degree"]).set_index("gene")
+
+
+def _loop_graph(g, df_protein_interaction):
+    # per row add_node/add_edge, as the pages used to build the graphs
+    for i in df_protein_interaction.index:
+        g.add_node(df_protein_interaction["preferredName_A"][i])
+        g.add_node(df_protein_interaction["preferredName_B"][i])
+        g.add_edge(df_protein_interaction["preferredName_A"][i], df_protein_interaction["preferredName_B"][i], weight = df_protein_interaction["score"][i])
+    return g
+
+
+def random_network(edges = 5000, genes = 1000, seed = 0):
+    """Random interaction data frame in the layout of the STRING network call"""
+    rng = np.random.default_rng(seed)
+    names = np.array(["GENE" + str(i) for i in range(genes)], dtype = object)
+    a = rng.integers(0, genes, 3 * edges)
+    b = rng.integers(0, genes, 3 * edges)
+    pairs = pd.DataFrame({"a": np.minimum(a, b), "b": np.maximum(a, b)})
+    pairs = pairs[pairs["a"] < pairs["b"]].drop_duplicates().head(edges)
+    return pd.DataFrame({
+        "preferredName_A": names[pairs["a"].to_numpy()],
+        "preferredName_B": names[pairs["b"].to_numpy()],
+        "score": rng.integers(400, 1000, len(pairs)) / 1000,
+    }).reset_index(drop = True), names.tolist()
+
+
+def benchmark(edges = 5000, genes = 1000, repeat = 3):
+    """Times the degree computation and graph construction, per row loops against bulk
+    out: dataframe of the best time in seconds per step
+    """
+    from pyvis import network as net
+
+    df_protein_interaction, gene_set = random_network(edges, genes)
+
+    def best(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    loop_degree, expected = best(lambda: _loop_degree(df_protein_interaction, gene_set))
+    bulk_degree, table = best(lambda: degree_table(df_protein_interaction, gene_set))
+    assert table["degree"].equals(expected["degree"])
+    loop_graph, g_loop = best(lambda: _loop_graph(net.Network(), df_protein_interaction))
+    bulk_graph, g_bulk = best(lambda: add_interactions(net.Network(), df_protein_interaction))
+    assert g_loop.node_ids == g_bulk.node_ids and g_loop.edges == g_bulk.edges
+
+    report = pd.DataFrame({
+        "loop": [loop_degree, loop_graph],
+        "bulk": [bulk_degree, bulk_graph],
+    }, index = pd.Index(["degree", "graph"], name = str(len(df_protein_interaction)) + " edges"))
+    report["speedup"] = report["loop"] / report["bulk"]
+    return report
@@ -0,0 +1,360 @@
+"""StarGazer target prioritization scores.
+
+Every gene associated with a disease (p-value <= p, PheWAS or GWAS) gets five
+features: the mean odds ratio of its associations (1 - odds ratio for the
+protective partition), its OpenTargets association score, the share of its
+associations found by both studies, its druggability (Pharos level above
+Tdark) and its degree in the STRING network of the partition's genes. Each
+feature is min-max normalised within the partition (overall, risk alleles
+with odds ratio >= 1, protective alleles with odds ratio < 1) and the
+StarGazer score is the weighted mean of the normalised features (equal
+weights by default). The grouping, normalisation, weighting and top-K
+selection run as NumPy array operations over all partitions at once.
+
+score_diseases computes the rankings of many diseases at once: the
+association features of all diseases come from one grouped pass over the
+disease rows, while the OpenTargets scores and STRING networks are fetched
+per disease across a process pool of at most client.MAX_PER_HOST workers. `python -m stargazer ingest --scores`
+stores the default rankings (p <= DEFAULT_P, all features) of every disease
+as the `scores` snapshot table, which the Prioritization page serves directly.
+
+Outside the dashboard, use rank() or
+`python -m stargazer score --disease <term> [--disease <term> ...] --p 5e-8 --out ranking.parquet`.
+"""
+import collections
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from stargazer import client, compact, network, snapshot, store
+
+FEATURES = ["odds-ratio", "opentargets_associations", "indicator_Phe_GWAS", "druggability_score", "networkDegree_score"]
+PARTITIONS = ["overall", "risk", "protective"]
+SCORE = "StarGazer score"
+DEFAULT_P = 0.05
+SCORE_TABLE = "scores"
+# feature matrices kept in memory by disease_matrix
+MATRIX_CACHE_SIZE = 64
+
+_lock = threading.Lock()
+_matrices = collections.OrderedDict()
+
+
+def disease_rows(diseases, gwas_index, phewas_index, p = None):
+    """Associations of every disease
+    in:  list of disease terms, term indexes of the GWAS associations and PheWAS phenotypes, p-value threshold
+    out: dataframe of disease position, row id of df_selected and whether both studies report the row
+    """
+    codes, rows, both = [], [], []
+    for i, disease in enumerate(diseases):
+        union = store.query_rows(disease, p, "union", gwas = gwas_index, phewas = phewas_index)
+        intersection = store.query_rows(disease, p, "intersection", gwas = gwas_index, phewas = phewas_index)
+        codes.append(np.full(len(union), i, dtype = np.int32))
+        rows.append(union)
+        both.append(np.isin(union, intersection, assume_unique = True))
+    return pd.DataFrame({
+        "disease": np.concatenate(codes) if codes else np.empty(0, dtype = np.int32),
+        "row": np.concatenate(rows).astype(np.int64) if rows else np.empty(0, dtype = np.int64),
+        "both": np.concatenate(both) if both else np.empty(0, dtype = bool),
+    })
+
+
+def association_features(df_selected, rows):
+    """Mean odds ratio and study overlap of every (disease, partition, gene), in one grouped pass
+    in:  df_selected, disease rows (see disease_rows) already filtered by p-value
+    out: dataframe (disease, partition, gene, odds-ratio, indicator_Phe_GWAS)
+    """
+    row = rows["row"].to_numpy()
+    odds = compact.decode(df_selected[["odds-ratio"]].iloc[row])["odds-ratio"].to_numpy(dtype = np.float64)
+    gene_codes, gene_names = pd.factorize(df_selected["gene_name"].iloc[row].astype(object).to_numpy())
+    disease = rows["disease"].to_numpy().astype(np.int64)
+
+    # one bincount over (disease, gene) pairs x (no odds ratio, risk, protective)
+    pairs, pair_codes = np.unique(disease * max(len(gene_names), 1) + gene_codes, return_inverse = True)
+    key = pair_codes.reshape(-1) * 3 + np.where(odds >= 1, 1, np.where(odds < 1, 2, 0))
+    size = 3 * len(pairs)
+    n = np.bincount(key, minlength = size).reshape(-1, 3)
+    odds_sum = np.bincount(key, weights = np.nan_to_num(odds), minlength = size).reshape(-1, 3)
+    odds_n = np.bincount(key, weights = ~np.isnan(odds), minlength = size).reshape(-1, 3)
+    both = np.bincount(key, weights = rows["both"].to_numpy(), minlength = size).reshape(-1, 3)
+
+    # overall partition over all rows, risk and protective over the pairs that have such rows
+    parts = [np.arange(len(pairs))] + [np.flatnonzero(n[:, part] > 0) for part in (1, 2)]
+    columns = {"disease": [], "partition": [], "gene": [], "odds-ratio": [], "indicator_Phe_GWAS": []}
+    for part, idx in enumerate(parts):
+        if part == 0:
+            n_part, odds_part, odds_n_part, both_part = n[idx].sum(1), odds_sum[idx].sum(1), odds_n[idx].sum(1), both[idx].sum(1)
+        else:
+            n_part, odds_part, odds_n_part, both_part = n[idx, part], odds_sum[idx, part], odds_n[idx, part], both[idx, part]
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            mean_odds = np.where(odds_n_part > 0, odds_part / odds_n_part, np.nan)
+        columns["disease"].append(pairs[idx] // max(len(gene_names), 1))
+        columns["partition"].append(np.full(len(idx), part))
+        columns["gene"].append(np.asarray(gene_names, dtype = object)[pairs[idx] % max(len(gene_names), 1)])
+        columns["odds-ratio"].append(1 - mean_odds if part == 2 else mean_odds)
+        columns["indicator_Phe_GWAS"].append(both_part / n_part)
+    return pd.DataFrame({name: np.concatenate(values) for name, values in columns.items()})
+
+
+def remote_features(disease_name, genes, risk_genes, protective_genes):
+    """OpenTargets scores and STRING network degrees of one disease
+    in:  disease name (without the " (...)" suffix), genes of the overall, risk and protective partitions
+    out: series of OpenTargets score per gene, dict of partition -> series of degree per gene,
+         whether a lookup failed and its features were replaced by 0
+    """
+    from stargazer import sources
+
+    # both lookups run concurrently
+    future_gene_score = sources.submit(sources.opentargets_gene_score, disease_name = disease_name)
+    future_network = sources.submit(sources.proteins_interaction, input_protein = genes)
+    degraded = False
+    gene_score = pd.Series(dtype = np.float64)
+    try:
+        df_gene_score = future_gene_score.result()
+        # not a data frame if OpenTargets has no disease of that name
+        if isinstance(df_gene_score, pd.DataFrame):
+            gene_score = df_gene_score.groupby("gene_symbol")["opentargets_associations"].mean()
+    except Exception:
+        degraded = True
+
+    degrees = {}
+    try:
+        df_network = future_network.result()
+    except Exception:
+        df_network = None
+        degraded = True
+    for partition, gene_set in zip(PARTITIONS, (genes, risk_genes, protective_genes)):
+        try:
+            df_protein_interaction = df_network if partition == "overall" else network.induced_subnetwork(df_network, gene_set)
+            degrees[partition] = network.degree_table(df_protein_interaction, gene_set)["degree"]
+        except Exception:
+            degrees[partition] = pd.Series(0, index = gene_set, dtype = np.int64)
+            degraded = True
+    return gene_score, degrees, degraded
+
+
+def _remote_features(args):
+    return remote_features(*args)
+
+
+def normalize(values, groups):
+    """Min-max normalises the columns of a matrix within groups of rows
+    in:  2-d float array, group id per row
+    out: 2-d float array; constant columns become 0 as with sklearn's MinMaxScaler, NaN stays NaN
+    """
+    if len(values) == 0:
+        return values.astype(np.float64)
+    order = np.argsort(groups, kind = "stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    low = np.fmin.reduceat(values[order], starts, axis = 0)
+    high = np.fmax.reduceat(values[order], starts, axis = 0)
+    span = high - low
+    span[span == 0] = 1
+
+    # group position of every row, in the original row order
+    position = np.empty(len(values), dtype = np.int64)
+    position[order] = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+    return (values - low[position]) / span[position]
+
+
+def rank_within_groups(groups, score, top = None):
+    """Row order by group, best score first, keeping the top rows of every group
+    in:  group id per row, score per row, number of rows to keep per group (all if None)
+    out: row positions
+    """
+    if top is None:
+        return np.lexsort((-score, groups))
+    order = np.argsort(groups, kind = "stable")
+    bounds = np.flatnonzero(np.diff(groups[order])) + 1
+    pieces = []
+    for idx in np.split(order, bounds):
+        negative = -score[idx]
+        if len(idx) > top:
+            # select the top rows without sorting the whole group
+            keep = np.argpartition(negative, top - 1)[:top]
+            idx, negative = idx[keep], negative[keep]
+        pieces.append(idx[np.argsort(negative, kind = "stable")])
+    return np.concatenate(pieces)
+
+
+def _check_features(features):
+    features = list(features)
+    unknown = [f for f in features if f not in FEATURES]
+    if unknown or not features:
+        raise ValueError("features must be a non-empty subset of " + ", ".join(FEATURES) + ", got: " + ", ".join(features))
+    return features
+
+
+def feature_weights(features, weights = None):
+    """Selected features and their weights, scaled to sum to 1 (equal weights if None)
+    Raises ValueError for unknown or no features and for negative, infinite, NaN or all-zero weights.
+    """
+    features = _check_features(features)
+    w = np.array([1.0 if weights is None else float(weights.get(f, 1.0)) for f in features])
+    if not np.isfinite(w).all() or (w < 0).any() or w.sum() <= 0:
+        raise ValueError("feature weights must be finite, non-negative and not all zero")
+    return features, w / w.sum()
+
+
+def feature_matrix(diseases, df_selected, gwas_index, phewas_index, druggable, p = DEFAULT_P, workers = None, log = None):
+    """Normalised features of the genes of many diseases
+    in:  list of disease terms (duplicates are dropped), df_selected, term indexes, druggability lookup, p-value threshold,
+         number of worker processes for the remote features (default and cap: client.MAX_PER_HOST, 1 runs in-process)
+    out: dataframe (disease, partition, gene_name, normalised features); attrs["degraded"] lists the
+         diseases whose OpenTargets or STRING lookup failed and whose remote features are 0
+    """
+    # repeated diseases are scored once, in order of first appearance
+    diseases = list(dict.fromkeys(diseases))
+    rows = disease_rows(diseases, gwas_index, phewas_index, p = p)
+    df = association_features(df_selected, rows)
+    df["druggability_score"] = druggable.scores(df["gene"])
+
+    # remote features, one task per disease
+    gene_sets = {key: group.tolist() for key, group in df.groupby(["disease", "partition"], sort = False)["gene"]}
+    tasks = []
+    for i in sorted(df["disease"].unique()):
+        tasks.append((diseases[i].split(" (")[0],) + tuple(gene_sets.get((i, part), []) for part in range(3)))
+    # every process has its own per-host connection slots, so more processes would exceed MAX_PER_HOST
+    workers = min(workers or client.MAX_PER_HOST, client.MAX_PER_HOST)
+    if log is not None:
+        log("Fetching OpenTargets scores and STRING networks of " + str(len(tasks)) + " diseases")
+    if workers == 1 or len(tasks) <= 1:
+        results = list(map(_remote_features, tasks))
+    else:
+        # spawn, so workers do not inherit sqlite connections or threads of the caller
+        with ProcessPoolExecutor(max_workers = workers, mp_context = multiprocessing.get_context("spawn")) as executor:
+            results = list(executor.map(_remote_features, tasks, chunksize = 4))
+
+    gene_scores, degree_frames, degraded = [], [], []
+    for i, (gene_score, degrees, failed) in zip(sorted(df["disease"].unique()), results):
+        if failed:
+            degraded.append(diseases[i])
+        gene_scores.append(pd.DataFrame({"disease": i, "gene": gene_score.index, "opentargets_associations": gene_score.to_numpy()}))
+        for part, partition in enumerate(PARTITIONS):
+            degree = degrees[partition]
+            degree_frames.append(pd.DataFrame({"disease": i, "partition": part, "gene": degree.index, "networkDegree_score": degree.to_numpy()}))
+    if gene_scores:
+        df = df.merge(pd.concat(gene_scores, ignore_index = True), on = ["disease", "gene"], how = "left")
+        df = df.merge(pd.concat(degree_frames, ignore_index = True).drop_duplicates(["disease", "partition", "gene"]), on = ["disease", "partition", "gene"], how = "left")
+    else:
+        df["opentargets_associations"] = np.nan
+        df["networkDegree_score"] = np.nan
+    df["opentargets_associations"] = df["opentargets_associations"].fillna(0)
+    df["networkDegree_score"] = df["networkDegree_score"].fillna(0)
+
+    # normalise within every disease and partition
+    groups = df["disease"].to_numpy() * len(PARTITIONS) + df["partition"].to_numpy()
+    matrix = pd.DataFrame({
+        "disease": pd.Categorical.from_codes(df["disease"].to_numpy(), categories = pd.Index(diseases)),
+        "partition": pd.Categorical.from_codes(df["partition"].to_numpy(), categories = PARTITIONS),
+        "gene_name": df["gene"].to_numpy(),
+    })
+    normalized = normalize(df[FEATURES].to_numpy(dtype = np.float64), groups)
+    for i, feature in enumerate(FEATURES):
+        matrix[feature] = normalized[:, i]
+    matrix.attrs["degraded"] = degraded
+    return matrix
+
+
+def score_matrix(matrix, features = FEATURES, weights = None, top = None):
+    """StarGazer scores of a feature matrix: the weighted mean of the selected normalised features
+    in:  feature matrix (see feature_matrix), features of the score, dict of feature -> weight
+         (default: equal weights), number of genes to keep per disease and partition (all if None)
+    out: dataframe (disease, partition, gene_name, StarGazer score, selected features), best genes first
+    """
+    features, w = feature_weights(features, weights)
+    score = np.nansum(matrix[features].to_numpy(dtype = np.float64) * w, axis = 1)
+    groups = matrix["disease"].cat.codes.to_numpy().astype(np.int64) * len(PARTITIONS) + matrix["partition"].cat.codes.to_numpy()
+    order = rank_within_groups(groups, score, top)
+    ranking = matrix[["disease", "partition", "gene_name"] + features].iloc[order].reset_index(drop = True)
+    ranking.insert(3, SCORE, score[order])
+    ranking.attrs["degraded"] = list(matrix.attrs.get("degraded", []))
+    return ranking
+
+
+def score_diseases(diseases, df_selected, gwas_index, phewas_index, druggable, p = DEFAULT_P, features = FEATURES, weights = None, workers = None, log = None):
+    """Ranks the genes of many diseases (see feature_matrix and score_matrix)
+    out: dataframe (disease, partition, gene_name, StarGazer score, selected features), best genes first
+    """
+    features, _ = feature_weights(features, weights)
+    matrix = feature_matrix(diseases, df_selected, gwas_index, phewas_index, druggable, p = p, workers = workers, log = log)
+    return score_matrix(matrix, features, weights)
+
+
+def partition_tables(ranking, features = FEATURES):
+    """Splits the ranking of one disease into the tables shown by the Prioritization page
+    out: dict of partition -> dataframe indexed by gene_name (StarGazer score, features)
+    """
+    tables = {}
+    for partition in PARTITIONS:
+        df = ranking[ranking["partition"] == partition].set_index("gene_name")[[SCORE] + list(features)]
+        df.index = df.index.astype(object)
+        if partition == "protective":
+            df = df.rename(columns = {"odds-ratio": "1-odds_ratio"})
+        tables[partition] = df
+    return tables
+
+
+def _store_matrix(diseases, p, workers = 1, log = None):
+    return feature_matrix(
+        diseases,
+        store.get_table("df_selected"),
+        store.gwas_index(),
+        store.phewas_index(),
+        store.druggability(),
+        p = p,
+        workers = workers,
+        log = log,
+    )
+
+
+def rank(diseases, p = DEFAULT_P, features = FEATURES, weights = None, top = None, workers = None, log = None):
+    """Ranks the genes of diseases of the current snapshot, e.g. from a pipeline or notebook
+    in:  list of disease terms (see store.vocabulary()), p-value threshold, features of the score,
+         feature weights, genes to keep per disease and partition, worker processes
+    out: dataframe (disease, partition, gene_name, StarGazer score, selected features), best genes first
+    """
+    feature_weights(features, weights)
+    return score_matrix(_store_matrix(list(dict.fromkeys(diseases)), p, workers = workers, log = log), features, weights, top)
+
+
+def disease_matrix(disease, p = DEFAULT_P):
+    """Normalised feature matrix of one disease of the current snapshot, shared by all sessions.
+    Read from the score table for the default p-value, otherwise computed once per
+    (snapshot, disease, p-value) and kept for the MATRIX_CACHE_SIZE most recent lookups,
+    so changing the features or weights of the score only recomputes the weighted sum.
+    A matrix whose OpenTargets or STRING lookup failed is not kept, so the next lookup retries.
+    out: dataframe (see feature_matrix), must not be modified
+    """
+    if p == DEFAULT_P and store.has_table(SCORE_TABLE):
+        scores = store.get_table(SCORE_TABLE)
+        matrix = scores[scores["disease"] == disease]
+        if len(matrix) > 0:
+            return matrix.drop(columns = SCORE)
+    key = (snapshot.current_version(), disease, p)
+    with _lock:
+        matrix = _matrices.get(key)
+        if matrix is not None:
+            _matrices.move_to_end(key)
+            return matrix
+    matrix = _store_matrix([disease], p)
+    if matrix.attrs["degraded"]:
+        return matrix
+    with _lock:
+        _matrices[key] = matrix
+        while len(_matrices) > MATRIX_CACHE_SIZE:
+            _matrices.popitem(last = False)
+    return matrix
+
+
+def disease_ranking(disease, p = DEFAULT_P, features = FEATURES, weights = None, top = None):
+    """Rankings of one disease as shown by the Prioritization page
+    out: dict of partition -> dataframe (see partition_tables), or None if no gene passes the p-value threshold
+    """
+    features, _ = feature_weights(features, weights)
+    matrix = disease_matrix(disease, p)
+    if len(matrix) == 0:
+        return None
+    return partition_tables(score_matrix(matrix, features, weights, top), features)
@@ -0,0 +1,196 @@
+"""Versioned, columnar snapshots of the StarGazer datasets.
+
+Tables are written as uncompressed Arrow IPC files so the dashboard pages can
+open them memory-mapped instead of re-parsing a CSV on every Streamlit rerun.
+Each ingest run writes a new directory under assets/snapshots/ together with
+a manifest of row counts and checksums; the directory is renamed into place
+and the CURRENT pointer replaced only once it is complete, so readers never
+see a half-written snapshot.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import pyarrow as pa
+
+ASSETS_DIR = os.path.join(os.getcwd(), "assets")
+SNAPSHOT_ROOT = os.path.join(ASSETS_DIR, "snapshots")
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+
+# column types of the snapshot tables (see stargazer.compact)
+SCHEMAS = {
+    "df_selected": pa.schema([
+        ("gene_name", pa.dictionary(pa.int32(), pa.string())),
+        ("snp", pa.dictionary(pa.int32(), pa.string())),
+        ("phewas phenotype", pa.dictionary(pa.int32(), pa.string())),
+        ("p-value", pa.float64()),
+        ("odds-ratio", pa.float32()),
+        ("gwas-associations", pa.dictionary(pa.int32(), pa.string())),
+        ("druggability level", pa.dictionary(pa.int8(), pa.string(), ordered = True)),
+    ]),
+    "df_druggable": pa.schema([
+        ("sym", pa.string()),
+        ("tdl", pa.dictionary(pa.int8(), pa.string(), ordered = True)),
+    ]),
+    "scores": pa.schema([
+        ("disease", pa.dictionary(pa.int32(), pa.string())),
+        ("partition", pa.dictionary(pa.int8(), pa.string())),
+        ("gene_name", pa.dictionary(pa.int32(), pa.string())),
+        ("StarGazer score", pa.float64()),
+        ("odds-ratio", pa.float64()),
+        ("opentargets_associations", pa.float64()),
+        ("indicator_Phe_GWAS", pa.float64()),
+        ("druggability_score", pa.float64()),
+        ("networkDegree_score", pa.float64()),
+    ]),
+}
+
+
+def current_version(root = SNAPSHOT_ROOT):
+    """Version of the snapshot the dashboard should read (None if no snapshot was built)"""
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_dir(root = SNAPSHOT_ROOT):
+    version = current_version(root)
+    if version is None:
+        raise FileNotFoundError("No data snapshot in " + root + ", run `python -m stargazer ingest` first")
+    return os.path.join(root, version)
+
+
+def table_path(name, directory = None):
+    if directory is None:
+        directory = current_dir()
+    return os.path.join(directory, name + ".arrow")
+
+
+def write_table(df, name, directory):
+    """Writes a data frame (or an Arrow table) as a typed Arrow IPC file
+    in:  dataframe, table name, output directory
+    out: path of the written file
+    """
+    if isinstance(df, pa.Table):
+        table = df
+    else:
+        schema = SCHEMAS.get(name)
+        if schema is not None:
+            df = df[schema.names]
+        table = pa.Table.from_pandas(df, schema = schema, preserve_index = False)
+    path = table_path(name, directory)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def read_arrow(name, directory = None):
+    """Opens a snapshot table memory-mapped, without copying the column buffers
+    in:  table name, snapshot directory (defaults to the current snapshot)
+    out: pyarrow Table
+    """
+    source = pa.memory_map(table_path(name, directory), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def read_table(name, directory = None):
+    """Loads a snapshot table as a panda dataframe
+    in:  table name, snapshot directory (defaults to the current snapshot)
+    out: dataframe
+    """
+    return read_arrow(name, directory).to_pandas()
+
+
+def read_manifest(directory = None):
+    if directory is None:
+        directory = current_dir()
+    with open(os.path.join(directory, MANIFEST)) as f:
+        return json.load(f)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_pointer(root, version):
+    tmp = os.path.join(root, CURRENT + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, CURRENT))
+
+
+def publish(tables, root = SNAPSHOT_ROOT, meta = None):
+    """Writes a complete snapshot and makes it the current one
+    in:  dict of table name -> dataframe, snapshot root, extra manifest fields
+    out: directory of the new snapshot
+    """
+    os.makedirs(root, exist_ok = True)
+    version = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    staging = tempfile.mkdtemp(prefix = "." + version + "-", dir = root)
+    try:
+        files = {}
+        for name, df in tables.items():
+            path = write_table(df, name, staging)
+            files[name] = {
+                "file": os.path.basename(path),
+                "rows": len(df),
+                "sha256": _sha256(path),
+            }
+        # pick the final name first so the manifest records it
+        final = os.path.join(root, version)
+        suffix = 1
+        while os.path.exists(final):
+            final = os.path.join(root, version + "-" + str(suffix))
+            suffix += 1
+        manifest = dict(meta or {})
+        manifest.update({"version": os.path.basename(final), "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "tables": files})
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent = 2)
+
+        # rename into place, then switch the pointer
+        os.chmod(staging, 0o755)
+        os.rename(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors = True)
+        raise
+    _write_pointer(root, os.path.basename(final))
+    return final
+
+
+def verify(directory = None):
+    """Checks the files of a snapshot against its manifest
+    in:  snapshot directory (defaults to the current snapshot)
+    out: list of table names whose checksum does not match
+    """
+    if directory is None:
+        directory = current_dir()
+    manifest = read_manifest(directory)
+    return [name for name, info in manifest["tables"].items()
+            if _sha256(os.path.join(directory, info["file"])) != info["sha256"]]
+
+
+def prune(keep = 3, root = SNAPSHOT_ROOT):
+    """Removes all but the newest `keep` snapshots, never the current one"""
+    current = current_version(root)
+    versions = sorted(d for d in os.listdir(root) if not d.startswith(".") and os.path.isdir(os.path.join(root, d)))
+    removed = []
+    for version in versions[:max(len(versions) - keep, 0)]:
+        if version == current:
+            continue
+        try:
+            shutil.rmtree(os.path.join(root, version))
+            removed.append(version)
+        except OSError:
+            # still memory-mapped by a running dashboard (Windows)
+            pass
+    return removed
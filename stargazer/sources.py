@@ -0,0 +1,151 @@
+"""External data sources used by the dashboard pages: OpenTargets and STRING.
+
+Responses are kept in the persistent cache (stargazer.cache), keyed by the
+lower-cased disease name or the sorted set of genes.
+"""
+import io
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from stargazer import cache, client, stringdb
+
+
+# shared by all sessions; stargazer.client caps the requests per host
+_executor = ThreadPoolExecutor(max_workers = 16, thread_name_prefix = "stargazer-fetch")
+
+def submit(fetch, *args, **kwargs):
+    """Runs a fetch function in the shared thread pool so that independent lookups overlap
+    out: concurrent.futures.Future of the result
+    """
+    return _executor.submit(fetch, *args, **kwargs)
+
+def _disease_key(disease_name):
+    return {"disease": disease_name.strip().lower()}
+
+def _gene_set_key(genes):
+    return {"genes": sorted(set(genes))}
+
+# function to generate a data frame of gene symbol and openTargets association score
+@cache.cached("opentargets", _disease_key, columns = ["gene_symbol", "opentargets_associations"])
+def opentargets_gene_score(disease_name):
+
+    # Set base URL of GraphQL API endpoint
+    base_url = "https://api.platform.opentargets.org/api/v4/graphql"
+
+    # query disease id via GraphQL API
+    query_string1 = """
+        query searchDiseaseID($diseaseName: String!, $entityNames: [String!]) {
+          search(queryString: $diseaseName, entityNames: $entityNames ) {
+            total
+          hits{
+            id
+            name
+          }
+          }
+        }
+    """
+
+    query_string2 = """
+        query associatedTargets($diseaseID: String!) {
+          disease(efoId: $diseaseID) {
+            id
+            name
+            associatedTargets(page: { index: 0, size: 300 })  {
+              count
+              rows {
+                target {
+                  approvedSymbol
+                }
+                score
+              }
+            }
+          }
+        }
+    """
+    # Set variables object of arguments to be passed to endpoint
+    variables = {"diseaseName": disease_name, "entityNames": ["disease"]}
+
+    # Perform POST request and check status code of response
+    r = client.post("opentargets", base_url, json={"query": query_string1, "variables": variables})
+    r.raise_for_status()
+
+    try:
+        df = pd.json_normalize(r.json()["data"]["search"]["hits"])
+        disease_id = df.loc[df["name"].str.lower() == disease_name.lower(), "id"].values[0]
+    except:
+        # no OpenTargets disease of that name
+        return []
+    variables = {"diseaseID": disease_id}
+
+    r = client.post("opentargets", base_url, json={"query": query_string2, "variables": variables})
+    r.raise_for_status()
+    try:
+        gene_scoreDF = pd.json_normalize(r.json()["data"]["disease"]["associatedTargets"]["rows"])
+        gene_scoreDF = gene_scoreDF.rename({
+            "score": "opentargets_associations",
+            "target.approvedSymbol": "gene_symbol"
+        }, axis = 1)
+    except:
+        gene_scoreDF = []
+
+    return gene_scoreDF
+
+def proteins_interaction(input_protein):
+    # answer from the local STRING store when it has been imported
+    network = stringdb.get_network()
+    if network is not None:
+        return network.network(input_protein)
+    return string_network(input_protein)
+
+@cache.cached("string", _gene_set_key, columns = ["preferredName_A", "preferredName_B", "score"])
+def string_network(input_protein):
+    string_api_url = "https://string-db.org/api"
+    output_format = "tsv"
+    method = "network"
+    request_url = "/".join([string_api_url, output_format, method])
+    params = {
+    "identifiers" : "%0d".join(input_protein), # your protein in a list
+    "species" : 9606, # species NCBI identifier
+    "caller_identity" : "stargazer" # your app name
+    }
+    response = client.post("string", request_url, data=params)
+    response.raise_for_status()
+    r = response.content
+    rawData = pd.read_csv(io.StringIO(r.decode('utf-8')), sep = "\t")
+    rawData_drop = rawData.drop_duplicates(keep = 'first').reset_index().drop('index', axis=1)
+    return rawData_drop
+
+@cache.cached("string", _gene_set_key, columns = ["category", "term", "description"])
+def go_enrichment(input_gene):
+    string_api_url = "https://string-db.org/api"
+    output_format = "tsv"
+    method = "enrichment"
+    request_url = "/".join([string_api_url, output_format, method])
+    params = {
+        "identifiers" : "%0d".join(input_gene), # your protein
+        "species" : 9606, # species NCBI identifier
+        "caller_identity" : "stargazer" # your app name
+    }
+    response = client.post("string", request_url, data=params)
+    response.raise_for_status()
+    r = response.content
+    rawData = pd.read_csv(io.StringIO(r.decode('utf-8')), sep = "\t")
+    return rawData
+
+def check_keys():
+    """Smoke check of the cached fetch functions: builds their cache keys, without fetching,
+    for the keyword calls the dashboard pages and scoring make and for positional calls
+    out: list of problems (empty if every call builds a key and both forms share it)
+    """
+    calls = [
+        (opentargets_gene_score, {"disease_name": "Asthma"}),
+        (string_network, {"input_protein": ["IL13", "IL4"]}),
+        (go_enrichment, {"input_gene": ["IL13", "IL4"]}),
+    ]
+    problems = []
+    for fetch, kwargs in calls:
+        try:
+            if fetch.key(**kwargs) != fetch.key(*kwargs.values()):
+                problems.append(fetch.__name__ + ": keyword and positional calls build different keys")
+        except Exception as e:
+            problems.append(fetch.__name__ + ": " + type(e).__name__ + ": " + str(e))
+    return problems
@@ -0,0 +1,219 @@
+"""Process-wide, read-only registry of the snapshot tables.
+
+Streamlit runs every browser session as a thread of the same server process,
+so the tables are loaded once here and the same frames are handed to every
+session and page branch instead of each script run holding its own copy.
+The row ids of the associations of a disease (see query) are cached the same
+way, so pages and sessions asking for the same disease and p-value share one
+lookup, and only the rows a page asks for are decoded.
+"""
+import collections
+import os
+import sys
+import threading
+import numpy as np
+from stargazer import compact, snapshot
+from stargazer.druggability import Druggability
+from stargazer.index import GENE_INDEX, GWAS_INDEX, PHEWAS_INDEX, SNP_INDEX, VOCABULARY, TermIndex, VariantIndex, Vocabulary
+
+QUERY_CACHE_SIZE = 128
+STUDIES = ["phewas", "gwas", "union", "intersection"]
+DIRECTIONS = ["all", "risk", "protective"]
+
+_lock = threading.RLock()
+_objects = {}
+_version = None
+_queries = collections.OrderedDict()
+
+
+def _get(key, load):
+    """Returns the shared object stored under key, building it with load(directory) on first use.
+    Switches to a newly published snapshot on the next access after an ingest.
+    """
+    global _version
+    version = snapshot.current_version()
+    obj = _objects.get(key) if version == _version else None
+    if obj is None:
+        with _lock:
+            if version != _version:
+                _objects.clear()
+                _queries.clear()
+                _version = version
+            obj = _objects.get(key)
+            if obj is None:
+                directory = os.path.join(snapshot.SNAPSHOT_ROOT, version) if version else snapshot.current_dir()
+                obj = load(directory)
+                _objects[key] = obj
+    return obj
+
+
+def get_table(name, decoded = False):
+    """Returns the shared data frame of a snapshot table, loading it on first use.
+    The frame is shared by all sessions and must not be modified in place;
+    numeric columns are backed by the read-only memory map.
+    in:  table name, whether to decode the compact columns (small tables only)
+    out: dataframe
+    """
+    if decoded:
+        return _get(("table", name, "decoded"), lambda directory: compact.decode(get_table(name)))
+    return _get(("table", name), lambda directory: snapshot.read_arrow(name, directory).to_pandas(split_blocks = True))
+
+
+def has_table(name):
+    """Whether the current snapshot holds a table, for optional tables such as the score table"""
+    return _get(("exists", name), lambda directory: os.path.exists(snapshot.table_path(name, directory)))
+
+
+def association_rows(rows):
+    """Decoded rows of the shared df_selected, for the pages to filter, merge and plot
+    in:  row ids or a slice
+    out: dataframe
+    """
+    return compact.decode(get_table("df_selected").iloc[rows])
+
+
+def variant_rows(snp, p = None):
+    """Slice of the shared df_selected holding the rows of a SNP
+    in:  SNP, p-value threshold (all rows if None); the rows of a SNP are sorted by p-value
+    out: slice
+    """
+    rows = variant_index().variant_rows(snp)
+    if p is None:
+        return rows
+    p_values = get_table("df_selected")["p-value"].to_numpy()
+    return slice(rows.start, rows.start + int(np.searchsorted(p_values[rows], p, side = "right")))
+
+
+def get_index(name):
+    """Returns the shared term index (see stargazer.index) of a snapshot
+    in:  index table name, e.g. index.GWAS_INDEX
+    out: TermIndex
+    """
+    return _get(("index", name), lambda directory: TermIndex(snapshot.read_arrow(name, directory)))
+
+
+def gwas_index():
+    return get_index(GWAS_INDEX)
+
+
+def phewas_index():
+    return get_index(PHEWAS_INDEX)
+
+
+def vocabulary():
+    """Returns the shared disease vocabulary of the current snapshot"""
+    return _get(("vocabulary", VOCABULARY), lambda directory: Vocabulary(snapshot.read_arrow(VOCABULARY, directory)))
+
+
+def variant_index():
+    """Returns the shared gene -> SNP -> rows index of the current snapshot"""
+    return _get(("index", SNP_INDEX), lambda directory: VariantIndex(snapshot.read_arrow(SNP_INDEX, directory), snapshot.read_arrow(GENE_INDEX, directory)))
+
+
+def druggability():
+    """Returns the shared gene symbol -> druggability lookup of the current snapshot"""
+    return _get(("druggability",), lambda directory: Druggability(get_table("df_druggable")))
+
+
+def query_rows(disease, p = None, study = "union", gwas = None, phewas = None):
+    """Row ids of df_selected associated with a disease, in row order
+    in:  disease term, p-value threshold (all rows if None), study (see query),
+         term indexes of the GWAS associations and PheWAS phenotypes (default: those of the current snapshot)
+    out: array of row ids
+    """
+    if study not in STUDIES:
+        raise ValueError("unknown study " + repr(study) + ", expected one of " + ", ".join(STUDIES))
+    phewas = phewas_index() if phewas is None else phewas
+    gwas = gwas_index() if gwas is None else gwas
+    phewas_rows = phewas.lookup(disease, p = p) if study != "gwas" else None
+    gwas_rows = gwas.lookup(disease, p = p) if study != "phewas" else None
+    if study == "phewas":
+        return np.sort(phewas_rows)
+    if study == "gwas":
+        return np.sort(gwas_rows)
+    if study == "union":
+        return np.union1d(phewas_rows, gwas_rows)
+    return np.intersect1d(phewas_rows, gwas_rows)
+
+
+def _query_ids(disease, p, study, direction):
+    # row ids are small next to decoded frames, so they are what the LRU keeps
+    if direction not in DIRECTIONS:
+        raise ValueError("unknown direction " + repr(direction) + ", expected one of " + ", ".join(DIRECTIONS))
+    key = (snapshot.current_version(), disease, p, study, direction)
+    with _lock:
+        rows = _queries.get(key)
+        if rows is not None:
+            _queries.move_to_end(key)
+            return rows
+    if direction == "all":
+        rows = query_rows(disease, p, study)
+    else:
+        rows = _query_ids(disease, p, study, "all")
+        odds = get_table("df_selected")["odds-ratio"].to_numpy()[rows]
+        rows = rows[odds >= 1] if direction == "risk" else rows[odds < 1]
+    with _lock:
+        _queries[key] = rows
+        while len(_queries) > QUERY_CACHE_SIZE:
+            _queries.popitem(last = False)
+    return rows
+
+
+def query(disease, p = None, study = "union", direction = "all"):
+    """Decoded associations of a disease.
+    The row ids of a query are shared by all sessions and pages: they are keyed by
+    (snapshot, disease, p-value, study, direction) and kept for the QUERY_CACHE_SIZE
+    most recent queries, while the rows are decoded on every call.
+    in:  disease term, p-value threshold (all rows if None),
+         study: phewas, gwas, union (either study) or intersection (both studies),
+         direction: all, risk (odds ratio >= 1) or protective (odds ratio < 1)
+    out: dataframe indexed by row id of df_selected, in row order
+    """
+    return association_rows(_query_ids(disease, p, study, direction))
+
+
+def clear():
+    """Drops the loaded tables and cached queries so that the next access reloads the snapshot"""
+    global _version
+    with _lock:
+        _objects.clear()
+        _queries.clear()
+        _version = None
+
+
+def resident_memory():
+    """Resident set size of the server process in bytes (None if unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except ImportError:
+        return None
+
+
+def _nbytes(obj):
+    if hasattr(obj, "memory_usage"):
+        return int(obj.memory_usage(deep = True).sum())
+    return int(getattr(obj, "nbytes", 0))
+
+
+def stats():
+    """Memory held by the registry, independent of the number of sessions
+    out: dict of loaded objects, their in-memory bytes and the process RSS
+    """
+    with _lock:
+        objects = dict(_objects)
+        queries = list(_queries.values())
+    return {
+        "version": _version,
+        "objects": sorted(":".join(key) for key in objects),
+        "bytes": sum(_nbytes(obj) for obj in objects.values()),
+        "queries": len(queries),
+        "query_bytes": sum(_nbytes(rows) for rows in queries),
+        "rss": resident_memory(),
+    }
@@ -0,0 +1,144 @@
+"""Local store of the STRING human (9606) protein-protein interaction network.
+
+`python -m stargazer import-string --links <9606.protein.links...txt.gz> --info <9606.protein.info...txt.gz>`
+converts the bulk files from https://string-db.org/cgi/download into a single
+Arrow file with one row per protein (preferred gene name, STRING id) and its
+neighbours and combined scores as list columns, i.e. a CSR adjacency matrix.
+When the file is present, network lookups are answered in-process from it.
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from stargazer import snapshot
+
+STRING_STORE = os.path.join(snapshot.ASSETS_DIR, "string", "9606.arrow")
+SPECIES = 9606
+# medium confidence, the threshold the STRING API applies to networks by default
+REQUIRED_SCORE = 400
+
+_lock = threading.Lock()
+_network = None
+_loaded = None
+
+
+def import_links(links_path, info_path, out = STRING_STORE, min_score = 150, chunksize = 2000000):
+    """Builds the local STRING store from the bulk download files
+    in:  protein.links file, protein.info file, output path, lowest combined score to keep
+    out: number of proteins and of (undirected) interactions stored
+    """
+    info = pd.read_csv(info_path, sep = "\t", usecols = [0, 1])
+    info.columns = ["string_id", "name"]
+    n = len(info)
+    proteins = pd.Index(info["string_id"])
+
+    # map the links to node ids chunk by chunk to bound memory
+    sources, targets, scores = [], [], []
+    for chunk in pd.read_csv(links_path, sep = " ", chunksize = chunksize):
+        a = proteins.get_indexer(chunk["protein1"])
+        b = proteins.get_indexer(chunk["protein2"])
+        s = chunk["combined_score"].to_numpy()
+        keep = (a >= 0) & (b >= 0) & (s >= min_score)
+        sources.append(a[keep].astype(np.int32))
+        targets.append(b[keep].astype(np.int32))
+        scores.append(s[keep].astype(np.int16))
+    a, b, s = np.concatenate(sources), np.concatenate(targets), np.concatenate(scores)
+
+    # symmetrise, drop duplicate pairs and sort by (source, target)
+    a, b, s = np.concatenate([a, b]), np.concatenate([b, a]), np.concatenate([s, s])
+    key = a.astype(np.int64) * n + b
+    order = np.argsort(key, kind = "stable")
+    key = key[order]
+    first = np.ones(len(key), dtype = bool)
+    first[1:] = key[1:] != key[:-1]
+    order = order[first]
+    a, b, s = a[order], b[order], s[order]
+
+    indptr = np.zeros(n + 1, dtype = np.int32)
+    np.cumsum(np.bincount(a, minlength = n), out = indptr[1:])
+    offsets = pa.array(indptr, type = pa.int32())
+    table = pa.table({
+        "name": pa.array(info["name"].tolist(), type = pa.string()),
+        "string_id": pa.array(info["string_id"].tolist(), type = pa.string()),
+        "neighbors": pa.ListArray.from_arrays(offsets, pa.array(b, type = pa.int32())),
+        "scores": pa.ListArray.from_arrays(offsets, pa.array(s, type = pa.int16())),
+    })
+
+    # write next to the target and swap it in
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok = True)
+    tmp = out + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, out)
+    return n, len(a) // 2
+
+
+class StringNetwork:
+    """CSR adjacency of the STRING network, keyed by preferred gene name"""
+
+    def __init__(self, table):
+        neighbors = table.column("neighbors").combine_chunks()
+        self.names = np.array(table.column("name").to_pylist(), dtype = object)
+        self.string_ids = np.array(table.column("string_id").to_pylist(), dtype = object)
+        self._position = {}
+        for i, name in enumerate(self.names):
+            self._position.setdefault(name, i)
+        self._indptr = neighbors.offsets.to_numpy()
+        self._indices = neighbors.flatten().to_numpy()
+        self._scores = table.column("scores").combine_chunks().flatten().to_numpy()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        return self._indptr.nbytes + self._indices.nbytes + self._scores.nbytes
+
+    def network(self, genes, required_score = REQUIRED_SCORE):
+        """Interactions among a gene set, in the layout of the STRING API network call
+        in:  list of gene names, lowest combined score (0-1000)
+        out: dataframe with one row per interaction
+        """
+        ids = np.unique(np.array([self._position[g] for g in set(genes) if g in self._position], dtype = np.int64))
+        selected = np.zeros(len(self.names), dtype = bool)
+        selected[ids] = True
+
+        # gather the adjacency rows of the selected proteins
+        starts = self._indptr[ids]
+        lengths = self._indptr[ids + 1] - starts
+        a = np.repeat(ids, lengths)
+        pos = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        b = self._indices[pos]
+        score = self._scores[pos]
+
+        # keep each induced edge once
+        keep = selected[b] & (a < b) & (score >= required_score)
+        a, b, score = a[keep], b[keep], score[keep]
+        return pd.DataFrame({
+            "stringId_A": self.string_ids[a],
+            "stringId_B": self.string_ids[b],
+            "preferredName_A": self.names[a],
+            "preferredName_B": self.names[b],
+            "ncbiTaxonId": SPECIES,
+            "score": score / 1000,
+        })
+
+
+def get_network(path = STRING_STORE):
+    """Returns the process-wide STRING network, reloading it when the file changes
+    out: StringNetwork, or None if no local store was imported
+    """
+    global _network, _loaded
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _loaded != (path, mtime):
+        with _lock:
+            if _loaded != (path, mtime):
+                source = pa.memory_map(path, "r")
+                _network = StringNetwork(pa.ipc.open_file(source).read_all())
+                _loaded = (path, mtime)
+    return _network
@@ -0,0 +1,82 @@
+"""Server-side filtering, sorting and paging of the dashboard tables.
+
+Only the rows of the visible page are handed to the browser. Filtering is a
+mask over the text columns, matched once per distinct value; sorting a
+numeric column only orders the rows up to the end of the page, with a
+partition, rather than the whole table.
+"""
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 100
+
+
+def sort_columns(df):
+    """Columns a table can be sorted by: its named index levels and its columns"""
+    return [name for name in df.index.names if name is not None] + list(df.columns)
+
+
+def _text_mask(values, text):
+    # case-insensitive substring match, once per distinct value
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values.to_numpy())
+    matches = pd.Index(uniques).astype(str).str.contains(text, case = False, regex = False)
+    return np.isin(codes, np.flatnonzero(matches))
+
+
+def filter_positions(df, text):
+    """Positions of the rows whose text columns (or index) contain a text, case-insensitive
+    out: array of row positions (all rows if text is empty)
+    """
+    if not text:
+        return np.arange(len(df))
+    mask = np.zeros(len(df), dtype = bool)
+    for name in df.index.names:
+        if name is not None:
+            level = df.index.get_level_values(name)
+            if not pd.api.types.is_numeric_dtype(level):
+                mask |= _text_mask(pd.Series(level), text)
+    for column in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column]):
+            mask |= _text_mask(df[column], text)
+    return np.flatnonzero(mask)
+
+
+def sort_positions(values, ascending = True, stop = None):
+    """Order of the first rows of a column, missing values last, ties in row order
+    in:  series of values, sort direction, number of leading rows needed (all if None)
+    out: array of positions into values
+    """
+    n = len(values)
+    stop = n if stop is None else min(stop, n)
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        order = pd.Series(values.to_numpy()).sort_values(ascending = ascending, kind = "mergesort", na_position = "last").index.to_numpy()
+        return order[:stop]
+    key = values.to_numpy(dtype = np.float64)
+    key = np.where(np.isnan(key), np.inf, key if ascending else -key)
+    if stop == 0:
+        return np.empty(0, dtype = np.int64)
+    candidates = np.arange(n)
+    if stop < n:
+        # every row up to the stop-th smallest key, ties included so the order stays stable
+        candidates = np.flatnonzero(key <= np.partition(key, stop - 1)[stop - 1])
+    return candidates[np.argsort(key[candidates], kind = "stable")][:stop]
+
+
+def window(df, text = "", sort_by = None, ascending = True, page = 0, page_size = PAGE_SIZE):
+    """One page of a table after filtering and sorting
+    in:  dataframe, filter text, column or index level to sort by (None keeps the table order),
+         sort direction, page number (from 0, clamped to the last page), rows per page
+    out: dataframe of the rows of the page, number of matching rows, page number shown
+    """
+    positions = filter_positions(df, text)
+    total = len(positions)
+    page = max(0, min(int(page), (total - 1) // page_size if total else 0))
+    start, stop = page * page_size, (page + 1) * page_size
+    if sort_by is not None:
+        values = df[sort_by] if sort_by in df.columns else pd.Series(df.index.get_level_values(sort_by))
+        values = values.iloc[positions] if total < len(df) else values
+        positions = positions[sort_positions(values, ascending, stop)]
+    return df.iloc[positions[start:stop]], total, page